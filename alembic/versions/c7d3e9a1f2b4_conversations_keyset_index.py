@@ -0,0 +1,45 @@
+"""conversations_keyset_index
+
+Revision ID: c7d3e9a1f2b4
+Revises: 266d91ae7e5e
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d3e9a1f2b4"
+down_revision: str | None = "266d91ae7e5e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Built concurrently so writes to conversations are not blocked while the index
+    # builds; CONCURRENTLY cannot run inside the migration's transaction. The
+    # composite index also serves lookups by user_id alone.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_conversations_user_id_updated_at_id",
+            "conversations",
+            ["user_id", "updated_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_conversations_user_id", table_name="conversations", postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_conversations_user_id", "conversations", ["user_id"], postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_conversations_user_id_updated_at_id",
+            table_name="conversations",
+            postgresql_concurrently=True,
+        )
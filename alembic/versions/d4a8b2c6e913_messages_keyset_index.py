@@ -0,0 +1,41 @@
+"""messages_keyset_index
+
+Revision ID: d4a8b2c6e913
+Revises: c7d3e9a1f2b4
+Create Date: 2026-10-18 11:03:54.918277
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a8b2c6e913"
+down_revision: str | None = "c7d3e9a1f2b4"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Built concurrently so writes to messages are not blocked while the index
+    # builds; CONCURRENTLY cannot run inside the migration's transaction. The
+    # composite index also serves lookups by conv_id alone.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_messages_conv_id_created_at_id",
+            "messages",
+            ["conv_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index("ix_messages_conv_id", table_name="messages", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_messages_conv_id", "messages", ["conv_id"], postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_messages_conv_id_created_at_id", table_name="messages", postgresql_concurrently=True
+        )
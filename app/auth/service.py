@@ -12,10 +12,12 @@ from app.auth.utils import (
     create_refresh_token,
     decode_token,
     get_refresh_token_expiry,
-    hash_password,
+    hash_password_async,
     hash_token,
-    verify_password,
+    password_needs_rehash,
+    verify_password_async,
 )
+from app.database import recent_writes
 from app.users.models import User
 from app.users.service import get_user_by_email, get_user_by_id
 
@@ -30,22 +32,32 @@ async def register_user(db: AsyncSession, data: RegisterRequest) -> User:
     user = User(
         full_name=data.full_name,
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
     )
     db.add(user)
     await db.flush()
     await db.refresh(user)
+    recent_writes.mark(user.id)
     return user
 
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User:
-    """Authenticate user by email and password."""
+    """
+    Authenticate user by email and password.
+
+    Hashes made with a different bcrypt cost than the configured one are
+    upgraded in place while the plain password is at hand.
+    """
     user = await get_user_by_email(db, email)
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await verify_password_async(password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
+
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(password)
+        await db.flush()
     return user
 
 
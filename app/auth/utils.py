@@ -1,5 +1,7 @@
+import asyncio
 import hashlib
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 
 import bcrypt
@@ -7,6 +9,12 @@ from jose import jwt
 
 from app.config import settings
 
+# bcrypt releases the GIL, so hashing on these threads keeps the event loop free.
+# The pool size caps concurrent hashes; further requests wait in its queue.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_max_concurrency, thread_name_prefix="password-hash"
+)
+
 
 def _prehash_password(password: str) -> bytes:
     """
@@ -24,7 +32,8 @@ def _prehash_password(password: str) -> bytes:
 
 def hash_password(password: str) -> str:
     """Hash a password using SHA-256 pre-hash + bcrypt."""
-    return bcrypt.hashpw(_prehash_password(password), bcrypt.gensalt()).decode()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(_prehash_password(password), salt).decode()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -32,6 +41,29 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(_prehash_password(plain_password), hashed_password.encode())
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash was made with a bcrypt cost other than the configured one."""
+    # bcrypt hashes look like $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password hashing pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_password, plain_password, hashed_password
+    )
+
+
 def hash_token(token: str) -> str:
     """Create SHA-256 hash of token for secure storage in database."""
     return hashlib.sha256(token.encode()).hexdigest()
@@ -1,29 +1,20 @@
 """Text chat handler - processes text messages."""
 
+import json
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.chat.handlers.turn import FALLBACK_RESPONSE, prepare_turn
 from app.chat.schemas import TextChatResponse
-from app.context import summary_context_provider
-from app.conversations.service import add_message, get_conversation_messages
-from app.guardrails import input_guardrails, output_guardrails
-from app.llm import LLMMessage, get_llm
-
-SYSTEM_PROMPT = """You are a compassionate mental health companion. Your role is to:
-- Listen actively and empathetically
-- Provide emotional support without judgment
-- Help users explore their feelings
-- Encourage healthy coping strategies
-- Suggest professional help when appropriate
-
-Important guidelines:
-- Never provide medical diagnoses or prescribe medication
-- Always take crisis situations seriously
-- Respect user boundaries and confidentiality
-- Use warm, understanding language
-
-Remember: You are a supportive companion, not a replacement for professional mental health care."""
+from app.context import conversation_summarizer
+from app.conversations.service import add_turn
+from app.database import async_session_maker
+from app.guardrails import output_guardrails
+from app.metrics import track_stage
+from app.providers import providers
 
 
 async def handle_text_chat(
@@ -36,53 +27,37 @@ async def handle_text_chat(
     Process a text chat message.
 
     Flow:
-    1. Validate input with guardrails
-    2. Check for crisis keywords
-    3. Get conversation context
-    4. Get conversation history
+    1-4. Concurrently validate input, check for crisis keywords and load
+         conversation context and history (see prepare_turn)
     5. Send to LLM
     6. Validate output with guardrails
     7. Save messages to database
     8. Return response
     """
-    # 1. Validate input
-    is_valid, error = await input_guardrails.validate(content)
-    if not is_valid:
-        raise ValueError(f"Input validation failed: {error}")
-
-    # 2. Check for crisis
-    is_crisis = await input_guardrails.check_crisis_keywords(content)
-
-    # 3. Get context
-    context = await summary_context_provider.get_context(db, conversation_id, user_id)
-
-    # 4. Get conversation history
-    messages = await get_conversation_messages(db, conversation_id, user_id, limit=20)
-    llm_messages = [LLMMessage(role=msg.role, content=msg.content) for msg in messages]
-    llm_messages.append(LLMMessage(role="user", content=content))
-
-    # Build system prompt with context
-    system_prompt = SYSTEM_PROMPT
-    if context:
-        system_prompt += f"\n\nContext:\n{context}"
+    # 1-4. Validate input, check for crisis, get context and history
+    is_crisis, system_prompt, llm_messages = await prepare_turn(user_id, conversation_id, content)
 
     # 5. Send to LLM
-    llm = get_llm()
-    response_content = await llm.chat(llm_messages, system_prompt=system_prompt)
+    llm = providers.llm
+    with track_stage("llm"):
+        response_content = await llm.chat(llm_messages, system_prompt=system_prompt)
 
     # 6. Validate output
-    is_valid, error = await output_guardrails.validate(response_content)
+    with track_stage("validate_output"):
+        is_valid, error = await output_guardrails.validate(response_content)
     if not is_valid:
-        response_content = "I apologize, but I need to rephrase my response. Could you please share more about how you're feeling?"
+        response_content = FALLBACK_RESPONSE
 
     # Add crisis resources if needed
     response_content = await output_guardrails.add_crisis_resources(response_content, is_crisis)
 
     # 7. Save messages
-    await add_message(db, conversation_id, user_id, "user", content, "text")
-    assistant_msg = await add_message(
-        db, conversation_id, user_id, "assistant", response_content, "text"
-    )
+    with track_stage("db_write"):
+        _, assistant_msg = await add_turn(
+            db, conversation_id, user_id, content, response_content, "text"
+        )
+    # The request session commits after the response is built
+    conversation_summarizer.schedule_after_commit(db, conversation_id)
 
     # 8. Return response
     return TextChatResponse(
@@ -90,3 +65,96 @@ async def handle_text_chat(
         content=response_content,
         is_crisis=is_crisis,
     )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_text_chat(
+    user_id: UUID,
+    conversation_id: UUID,
+    content: str,
+) -> AsyncGenerator[str, None]:
+    """
+    Process a text chat message, streaming the reply as Server-Sent Events.
+
+    Input validation, crisis detection, context and history run before the
+    first event is produced, so their errors surface as regular HTTP errors.
+    The returned generator then emits:
+
+    - ``crisis``: ``{"is_crisis": bool}``, sent first
+    - ``token``: ``{"content": str}``, one per LLM chunk
+    - ``replace``: ``{"content": str}``, if output guardrails reject the reply;
+      generation stops as soon as the offending chunk arrives
+    - ``done``: ``{"message_id": str}``, once the turn has been persisted
+    - ``error``: ``{"detail": str}``, instead of ``done`` if generating or
+      persisting the reply fails; the stream then ends and nothing is saved
+
+    The generator persists the turn with its own session, because a
+    request-scoped session may already be closed while the response streams.
+    """
+    # 1-4. Validate input, check for crisis, get context and history
+    is_crisis, system_prompt, llm_messages = await prepare_turn(user_id, conversation_id, content)
+
+    llm = providers.llm
+
+    async def events() -> AsyncGenerator[str, None]:
+        yield _sse("crisis", {"is_crisis": is_crisis})
+
+        try:
+            # 5-6. Stream from LLM, validating each chunk before it is sent
+            chunks: list[str] = []
+            validator = output_guardrails.stream_validator()
+            stream = llm.chat_stream(llm_messages, system_prompt=system_prompt)
+            async with aclosing(stream):
+                async for chunk in stream:
+                    if not validator.feed(chunk):
+                        break
+                    chunks.append(chunk)
+                    yield _sse("token", {"content": chunk})
+            response_content = "".join(chunks)
+
+            # The whole reply is checked again as a backstop before it is persisted
+            if validator.error is None:
+                with track_stage("validate_output"):
+                    is_valid, _ = await output_guardrails.validate(response_content)
+            else:
+                is_valid = False
+
+            # Earlier tokens are already on the wire, so ask the client to replace
+            # what it rendered
+            if not is_valid:
+                response_content = FALLBACK_RESPONSE
+                yield _sse("replace", {"content": response_content})
+
+            with_resources = await output_guardrails.add_crisis_resources(
+                response_content, is_crisis
+            )
+            if with_resources != response_content:
+                yield _sse("token", {"content": with_resources[len(response_content) :]})
+            response_content = with_resources
+
+            # 7. Save messages
+            with track_stage("db_write"):
+                async with async_session_maker() as session:
+                    _, assistant_msg = await add_turn(
+                        session,
+                        conversation_id,
+                        user_id,
+                        content,
+                        response_content,
+                        "text",
+                    )
+                    await session.commit()
+            conversation_summarizer.schedule(conversation_id)
+
+            yield _sse("done", {"message_id": str(assistant_msg.id)})
+        except Exception:
+            # The 200 headers are already sent, so tell the client the reply
+            # failed before the stream ends; nothing has been persisted
+            yield _sse("error", {"detail": "The reply could not be completed"})
+            raise
+
+    return events()
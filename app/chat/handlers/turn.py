@@ -0,0 +1,107 @@
+"""Shared preparation of a chat turn before it is sent to the LLM."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from typing import TypeVar
+from uuid import UUID
+
+from app.config import settings
+from app.context import summary_context_provider
+from app.conversations.models import MessageRole
+from app.conversations.service import get_messages_since_summary
+from app.database import async_session_maker
+from app.guardrails import input_guardrails
+from app.llm import LLMMessage
+from app.llm.prompt import build_prompt
+from app.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SYSTEM_PROMPT = """You are a compassionate mental health companion. Your role is to:
+- Listen actively and empathetically
+- Provide emotional support without judgment
+- Help users explore their feelings
+- Encourage healthy coping strategies
+- Suggest professional help when appropriate
+
+Important guidelines:
+- Never provide medical diagnoses or prescribe medication
+- Always take crisis situations seriously
+- Respect user boundaries and confidentiality
+- Use warm, understanding language
+
+Remember: You are a supportive companion, not a replacement for professional mental health care."""
+
+FALLBACK_RESPONSE = (
+    "I apologize, but I need to rephrase my response. "
+    "Could you please share more about how you're feeling?"
+)
+
+
+async def _timed(stage: str, awaitable: Awaitable[T]) -> T:
+    """Await a stage, recording its latency and errors."""
+    with track_stage(stage):
+        return await awaitable
+
+
+async def _with_fallback(stage: str, awaitable: Awaitable[T], fallback: T) -> T:
+    """Run an optional stage, substituting ``fallback`` if it fails."""
+    try:
+        return await _timed(stage, awaitable)
+    except Exception:
+        logger.warning("Chat stage %r failed, continuing without it", stage, exc_info=True)
+        return fallback
+
+
+async def _get_context(conversation_id: UUID, user_id: UUID) -> str:
+    async with async_session_maker() as session:
+        return await summary_context_provider.get_context(session, conversation_id, user_id)
+
+
+async def _get_history(conversation_id: UUID, user_id: UUID) -> list[tuple[MessageRole, str]]:
+    async with async_session_maker() as session:
+        return await get_messages_since_summary(
+            session, conversation_id, user_id, limit=settings.history_max_messages
+        )
+
+
+async def prepare_turn(
+    user_id: UUID,
+    conversation_id: UUID,
+    content: str,
+) -> tuple[bool, str, list[LLMMessage]]:
+    """
+    Run the independent pre-LLM stages of a turn concurrently.
+
+    Input validation, crisis detection, context retrieval (the conversation
+    summary) and history loading (the messages the summary doesn't cover yet)
+    don't depend on each other, so the LLM call can start once the slowest of
+    them finishes. The DB-backed stages each use their own short-lived session,
+    since an AsyncSession can't run concurrent queries. The results are then
+    packed into ``prompt_token_budget`` by build_prompt.
+
+    Failure policy:
+    - input validation and history are required; their errors propagate
+      (including the 404 for a conversation the user doesn't own)
+    - a failed crisis check is treated as a crisis, so resources are shown
+    - a failed context lookup degrades to no context
+
+    Returns:
+        tuple: (is_crisis, system_prompt, llm_messages ending with the user message)
+    """
+    (is_valid, error), is_crisis, context, history = await asyncio.gather(
+        _timed("validate_input", input_guardrails.validate(content)),
+        _with_fallback("crisis", input_guardrails.check_crisis_keywords(content), True),
+        _with_fallback("context", _get_context(conversation_id, user_id), ""),
+        _timed("history", _get_history(conversation_id, user_id)),
+    )
+    if not is_valid:
+        raise ValueError(f"Input validation failed: {error}")
+
+    system_prompt, llm_messages = build_prompt(
+        SYSTEM_PROMPT, context, history, content, settings.prompt_token_budget
+    )
+    return is_crisis, system_prompt, llm_messages
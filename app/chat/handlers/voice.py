@@ -1,25 +1,50 @@
 """Voice chat handler - processes voice messages."""
 
-from uuid import UUID
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from typing import BinaryIO
+from uuid import UUID, uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.chat.handlers.text import SYSTEM_PROMPT
+from app.chat.handlers.turn import FALLBACK_RESPONSE, prepare_turn
 from app.chat.schemas import VoiceChatResponse
-from app.context import summary_context_provider
-from app.conversations.service import add_message, get_conversation_messages
+from app.context import conversation_summarizer
+from app.conversations.service import add_turn
+from app.database import async_session_maker
+from app.guardrails import output_guardrails
+from app.guardrails.output import CRISIS_RESOURCES
+from app.metrics import track_stage
+from app.providers import providers
+from app.speech.sentences import SentenceSplitter
 
-# from app.emotion import hume_detector
-from app.guardrails import input_guardrails, output_guardrails
-from app.llm import LLMMessage, get_llm
-from app.speech import get_stt, get_tts
+# Sentences synthesized ahead of the one currently being sent to the client
+TTS_LOOKAHEAD = 3
+
+# Fixed replies that are spoken verbatim, pre-rendered into the speech cache
+FIXED_PHRASES = (FALLBACK_RESPONSE, CRISIS_RESOURCES)
+
+logger = logging.getLogger(__name__)
+
+
+async def prerender_fixed_phrases() -> None:
+    """Synthesize FIXED_PHRASES so the first turn that needs them hits the cache."""
+    results = await asyncio.gather(
+        *(providers.tts.synthesize(phrase) for phrase in FIXED_PHRASES),
+        return_exceptions=True,
+    )
+    for phrase, result in zip(FIXED_PHRASES, results, strict=True):
+        if isinstance(result, Exception):
+            logger.warning("Pre-rendering %r failed: %s", phrase[:40], result)
 
 
 async def handle_voice_chat(
     db: AsyncSession,
     user_id: UUID,
     conversation_id: UUID,
-    audio_data: bytes,
+    audio_data: BinaryIO,
 ) -> tuple[VoiceChatResponse, bytes | None]:
     """
     Process a voice chat message.
@@ -27,10 +52,8 @@ async def handle_voice_chat(
     Flow:
     1. Transcribe audio (STT)
     2. Detect emotions from audio
-    3. Validate input with guardrails
-    4. Check for crisis keywords
-    5. Get conversation context
-    6. Get conversation history
+    3-6. Concurrently validate input, check for crisis keywords and load
+         conversation context and history (see prepare_turn)
     7. Send to LLM (with emotion context)
     8. Validate output with guardrails
     9. Convert response to speech (TTS)
@@ -38,60 +61,65 @@ async def handle_voice_chat(
     11. Return response with audio
     """
     # 1. Transcribe audio
-    stt = get_stt()
-    transcript = await stt.transcribe(audio_data)
+    stt = providers.stt
+    with track_stage("stt"):
+        transcript = await stt.transcribe(audio_data)
 
     # 2. Detect emotions
-    # emotion_result = await hume_detector.detect_from_audio(audio_data)
-
-    # 3. Validate input
-    is_valid, error = await input_guardrails.validate(transcript)
-    if not is_valid:
-        raise ValueError(f"Input validation failed: {error}")
-
-    # 4. Check for crisis
-    is_crisis = await input_guardrails.check_crisis_keywords(transcript)
-
-    # 5. Get context
-    context = await summary_context_provider.get_context(db, conversation_id, user_id)
+    # emotion_result = await providers.emotion.detect_from_audio(audio_data)
 
-    # 6. Get conversation history
-    messages = await get_conversation_messages(db, conversation_id, user_id, limit=20)
-    llm_messages = [LLMMessage(role=msg.role, content=msg.content) for msg in messages]
-    llm_messages.append(LLMMessage(role="user", content=transcript))
+    # 3-6. Validate input, check for crisis, get context and history
+    is_crisis, system_prompt, llm_messages = await prepare_turn(
+        user_id, conversation_id, transcript
+    )
 
-    # Build system prompt with context and emotion
-    system_prompt = SYSTEM_PROMPT
-    if context:
-        system_prompt += f"\n\nContext:\n{context}"
+    # Add emotion to the system prompt
     # if emotion_result:
     #     system_prompt += f"\n\nUser's detected emotional state: {emotion_result.dominant_emotion} (confidence: {emotion_result.confidence:.2f})"
 
     # 7. Send to LLM
-    llm = get_llm()
-    response_content = await llm.chat(llm_messages, system_prompt=system_prompt)
+    llm = providers.llm
+    with track_stage("llm"):
+        response_content = await llm.chat(llm_messages, system_prompt=system_prompt)
 
     # 8. Validate output
-    is_valid, error = await output_guardrails.validate(response_content)
+    with track_stage("validate_output"):
+        is_valid, error = await output_guardrails.validate(response_content)
     if not is_valid:
-        response_content = "I apologize, but I need to rephrase my response. Could you please share more about how you're feeling?"
+        response_content = FALLBACK_RESPONSE
+
+    # 9. Convert to speech. The crisis resources are synthesized on their own
+    # so the fixed block is served from the speech cache.
+    tts = providers.tts
+    with track_stage("tts"):
+        if is_crisis:
+            spoken, resources = await asyncio.gather(
+                tts.synthesize(response_content), tts.synthesize(CRISIS_RESOURCES)
+            )
+            audio_response = spoken + resources
+        else:
+            audio_response = await tts.synthesize(response_content)
 
     # Add crisis resources if needed
     response_content = await output_guardrails.add_crisis_resources(response_content, is_crisis)
 
-    # 9. Convert to speech
-    tts = get_tts()
-    audio_response = await tts.synthesize(response_content)
-
     # 10. Save messages
     metadata = None
     # if emotion_result:
     #     metadata = {"emotion": emotion_result.model_dump()}
 
-    await add_message(db, conversation_id, user_id, "user", transcript, "voice", metadata=metadata)
-    assistant_msg = await add_message(
-        db, conversation_id, user_id, "assistant", response_content, "voice"
-    )
+    with track_stage("db_write"):
+        _, assistant_msg = await add_turn(
+            db,
+            conversation_id,
+            user_id,
+            transcript,
+            response_content,
+            "voice",
+            user_metadata=metadata,
+        )
+    # The request session commits after the response is built
+    conversation_summarizer.schedule_after_commit(db, conversation_id)
 
     # 11. Return response
     return VoiceChatResponse(
@@ -100,3 +128,110 @@ async def handle_voice_chat(
         emotion=None,
         is_crisis=is_crisis,
     ), audio_response
+
+
+async def stream_voice_chat(
+    user_id: UUID,
+    conversation_id: UUID,
+    audio_data: BinaryIO,
+) -> tuple[UUID, bool, AsyncGenerator[bytes, None]]:
+    """
+    Process a voice chat message, streaming the spoken reply sentence by sentence.
+
+    Transcription, guardrails, context and history run up front so their
+    errors surface as regular HTTP errors. The LLM reply is then streamed and
+    split at sentence boundaries; each sentence is sent to TTS as soon as it is
+    complete, up to TTS_LOOKAHEAD sentences ahead of playback, and the audio
+    is yielded in order.
+
+    Returns:
+        tuple: (assistant message id, is_crisis, audio chunk generator)
+    """
+    # 1. Transcribe audio
+    with track_stage("stt"):
+        transcript = await providers.stt.transcribe(audio_data)
+
+    # 2-5. Validate input, check for crisis, get context and history
+    is_crisis, system_prompt, llm_messages = await prepare_turn(
+        user_id, conversation_id, transcript
+    )
+
+    llm = providers.llm
+    tts = providers.tts
+    message_id = uuid4()
+
+    async def produce(queue: asyncio.Queue, spoken: list[str]) -> None:
+        """Stream the LLM reply and schedule TTS for each completed sentence."""
+
+        async def speak(sentence: str) -> None:
+            spoken.append(sentence)
+            await queue.put(asyncio.create_task(tts.synthesize(sentence)))
+
+        try:
+            splitter = SentenceSplitter()
+            # Chunks are validated before their sentences are spoken, so a
+            # sentence containing a harmful phrase never reaches TTS
+            validator = output_guardrails.stream_validator()
+            stream = llm.chat_stream(llm_messages, system_prompt=system_prompt)
+            async with aclosing(stream):
+                async for chunk in stream:
+                    if not validator.feed(chunk):
+                        break
+                    for sentence in splitter.feed(chunk):
+                        await speak(sentence)
+            if validator.error is None:
+                if remainder := splitter.flush():
+                    await speak(remainder)
+            else:
+                # Already-queued sentences are safe; replace the rest of the reply
+                spoken.append(FALLBACK_RESPONSE)
+                await queue.put(asyncio.create_task(tts.synthesize(FALLBACK_RESPONSE)))
+
+            if is_crisis:
+                await queue.put(asyncio.create_task(tts.synthesize(CRISIS_RESOURCES)))
+        finally:
+            # Signal the end of the reply unless the client went away
+            if not asyncio.current_task().cancelling():
+                await queue.put(None)
+
+    async def audio_chunks() -> AsyncGenerator[bytes, None]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=TTS_LOOKAHEAD)
+        spoken: list[str] = []
+        producer = asyncio.create_task(produce(queue, spoken))
+        try:
+            while (task := await queue.get()) is not None:
+                yield await task
+            await producer
+            response_content = " ".join(spoken)
+            # The audio has already been played, but a reply that fails the
+            # whole-text check is not persisted
+            with track_stage("validate_output"):
+                is_valid, _ = await output_guardrails.validate(response_content)
+            if not is_valid:
+                response_content = FALLBACK_RESPONSE
+            response_content = await output_guardrails.add_crisis_resources(
+                response_content, is_crisis
+            )
+
+            # Save messages
+            with track_stage("db_write"):
+                async with async_session_maker() as session:
+                    await add_turn(
+                        session,
+                        conversation_id,
+                        user_id,
+                        transcript,
+                        response_content,
+                        "voice",
+                        assistant_message_id=message_id,
+                    )
+                    await session.commit()
+            conversation_summarizer.schedule(conversation_id)
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                task = queue.get_nowait()
+                if task is not None:
+                    task.cancel()
+
+    return message_id, is_crisis, audio_chunks()
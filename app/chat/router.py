@@ -1,44 +1,71 @@
+import asyncio
 from uuid import UUID
 
 from fastapi import APIRouter, File, Form, UploadFile
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 
 from app.chat.schemas import TextChatRequest, TextChatResponse, VoiceChatResponse
-from app.chat.service import process_text_chat, process_voice_chat
-from app.dependencies import CurrentUser, DbSession
+from app.chat.service import (
+    process_text_chat,
+    process_text_chat_stream,
+    process_voice_chat,
+    process_voice_chat_stream,
+)
+from app.chat.uploads import open_audio_upload
+from app.dependencies import CurrentUserId, DbSession
+from app.providers import providers
 
 router = APIRouter()
 
 
 @router.post("/text", response_model=TextChatResponse)
-async def text_chat(db: DbSession, current_user: CurrentUser, request: TextChatRequest):
+async def text_chat(db: DbSession, user_id: CurrentUserId, request: TextChatRequest):
     """
     Send a text message and receive a text response.
     """
-    return await process_text_chat(db, current_user.id, request)
+    return await process_text_chat(db, user_id, request)
+
+
+@router.post("/text/stream")
+async def text_chat_stream(user_id: CurrentUserId, request: TextChatRequest):
+    """
+    Send a text message and stream the response as Server-Sent Events.
+
+    Emits a `crisis` event, then `token` events as the reply is generated,
+    and finally a `done` event carrying the persisted `message_id`. A
+    `replace` event carries a substitute reply when guardrails reject the
+    generated one. If the reply fails after streaming has started, an `error`
+    event is sent instead of `done` and the turn is not saved.
+    """
+    events = await process_text_chat_stream(user_id, request)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/voice", response_model=VoiceChatResponse)
 async def voice_chat(
     db: DbSession,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     conversation_id: UUID = Form(...),
     audio: UploadFile = File(...),
 ):
     """`
     Send a voice message and receive a text response.
 
-    The audio file should be in a supported format (wav, mp3, webm, etc.)
+    The audio file should be WAV, MP3, Ogg (Opus or Vorbis), WebM, FLAC or MP4.
     """
-    audio_data = await audio.read()
-    response, _ = await process_voice_chat(db, current_user.id, conversation_id, audio_data)
+    audio_data = await asyncio.to_thread(open_audio_upload, audio)
+    response, _ = await process_voice_chat(db, user_id, conversation_id, audio_data)
     return response
 
 
 @router.post("/voice/audio")
 async def voice_chat_with_audio(
     db: DbSession,
-    current_user: CurrentUser,
+    user_id: CurrentUserId,
     conversation_id: UUID = Form(...),
     audio: UploadFile = File(...),
 ):
@@ -47,9 +74,37 @@ async def voice_chat_with_audio(
 
     Returns the audio response directly as bytes.
     """
-    audio_data = await audio.read()
-    _, audio_response = await process_voice_chat(db, current_user.id, conversation_id, audio_data)
+    audio_data = await asyncio.to_thread(open_audio_upload, audio)
+    _, audio_response = await process_voice_chat(db, user_id, conversation_id, audio_data)
 
     if audio_response:
-        return Response(content=audio_response, media_type="audio/mpeg")
+        return Response(content=audio_response, media_type=providers.tts.media_type)
     return Response(status_code=204)
+
+
+@router.post("/voice/stream")
+async def voice_chat_stream(
+    user_id: CurrentUserId,
+    conversation_id: UUID = Form(...),
+    audio: UploadFile = File(...),
+):
+    """
+    Send a voice message and stream the audio response as it is synthesized.
+
+    The reply is spoken sentence by sentence, so playback can start before the
+    full response has been generated. The assistant message id and crisis flag
+    are returned in the `X-Message-Id` and `X-Is-Crisis` headers.
+    """
+    audio_data = await asyncio.to_thread(open_audio_upload, audio)
+    message_id, is_crisis, audio_chunks = await process_voice_chat_stream(
+        user_id, conversation_id, audio_data
+    )
+    return StreamingResponse(
+        audio_chunks,
+        media_type=providers.tts.media_type,
+        headers={
+            "X-Message-Id": str(message_id),
+            "X-Is-Crisis": str(is_crisis).lower(),
+            "X-Accel-Buffering": "no",
+        },
+    )
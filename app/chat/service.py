@@ -1,10 +1,38 @@
+import weakref
+from collections.abc import AsyncGenerator
+from contextlib import ExitStack, aclosing
+from typing import BinaryIO, TypeVar
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.chat.handlers.text import handle_text_chat
-from app.chat.handlers.voice import handle_voice_chat
+from app.chat.handlers.text import handle_text_chat, stream_text_chat
+from app.chat.handlers.voice import handle_voice_chat, stream_voice_chat
 from app.chat.schemas import TextChatRequest, TextChatResponse, VoiceChatResponse
+from app.metrics import track_turn
+
+T = TypeVar("T")
+
+
+async def _tracked(tracking: ExitStack, stream: AsyncGenerator[T, None]) -> AsyncGenerator[T, None]:
+    with tracking:
+        async with aclosing(stream):
+            async for item in stream:
+                yield item
+
+
+def _track_stream(tracking: ExitStack, stream: AsyncGenerator[T, None]) -> AsyncGenerator[T, None]:
+    """
+    Hand a streamed turn's metrics over to its stream.
+
+    The turn was started before the stream was set up, so STT, guardrails,
+    context and history and their errors are covered; it ends when the stream
+    does, or when the stream is discarded without being iterated because the
+    client went away before the first chunk.
+    """
+    tracked = _tracked(tracking, stream)
+    weakref.finalize(tracked, tracking.close)
+    return tracked
 
 
 async def process_text_chat(
@@ -13,24 +41,57 @@ async def process_text_chat(
     request: TextChatRequest,
 ) -> TextChatResponse:
     """Process a text chat request."""
-    return await handle_text_chat(
-        db=db,
-        user_id=user_id,
-        conversation_id=request.conversation_id,
-        content=request.content,
-    )
+    with track_turn("text"):
+        return await handle_text_chat(
+            db=db,
+            user_id=user_id,
+            conversation_id=request.conversation_id,
+            content=request.content,
+        )
+
+
+async def process_text_chat_stream(
+    user_id: UUID,
+    request: TextChatRequest,
+) -> AsyncGenerator[str, None]:
+    """Process a text chat request, returning a stream of Server-Sent Events."""
+    with ExitStack() as tracking:
+        tracking.enter_context(track_turn("text_stream"))
+        events = await stream_text_chat(
+            user_id=user_id,
+            conversation_id=request.conversation_id,
+            content=request.content,
+        )
+        return _track_stream(tracking.pop_all(), events)
 
 
 async def process_voice_chat(
     db: AsyncSession,
     user_id: UUID,
     conversation_id: UUID,
-    audio_data: bytes,
+    audio_data: BinaryIO,
 ) -> tuple[VoiceChatResponse, bytes | None]:
     """Process a voice chat request."""
-    return await handle_voice_chat(
-        db=db,
-        user_id=user_id,
-        conversation_id=conversation_id,
-        audio_data=audio_data,
-    )
+    with track_turn("voice"):
+        return await handle_voice_chat(
+            db=db,
+            user_id=user_id,
+            conversation_id=conversation_id,
+            audio_data=audio_data,
+        )
+
+
+async def process_voice_chat_stream(
+    user_id: UUID,
+    conversation_id: UUID,
+    audio_data: BinaryIO,
+) -> tuple[UUID, bool, AsyncGenerator[bytes, None]]:
+    """Process a voice chat request, returning the reply as a stream of audio chunks."""
+    with ExitStack() as tracking:
+        tracking.enter_context(track_turn("voice_stream"))
+        message_id, is_crisis, audio_chunks = await stream_voice_chat(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            audio_data=audio_data,
+        )
+        return message_id, is_crisis, _track_stream(tracking.pop_all(), audio_chunks)
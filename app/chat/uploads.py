@@ -0,0 +1,117 @@
+"""
+Bounded ingestion of voice uploads.
+
+Request bodies on the voice endpoints are capped while they stream in, and the
+multipart parser spools the audio part to a temporary file (in memory up to
+1MB, on disk beyond that). Handlers then receive that file object rewound to
+the start rather than a ``bytes`` copy of the whole clip.
+"""
+
+import json
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.speech.duration import SUPPORTED_FORMATS, audio_duration
+
+# Allowance for multipart boundaries and the non-file form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Audio upload exceeds {settings.audio_upload_max_bytes} bytes",
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects request bodies larger than ``max_bytes`` on the given path prefixes.
+
+    Declared ``Content-Length`` values are checked before the body is read;
+    chunked bodies are counted as they are received, so an oversized upload
+    is cut off without being buffered first.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefixes: tuple[str, ...], max_bytes: int):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name != b"content-length":
+                continue
+            if not value.isdigit():
+                await _send_error(send, status.HTTP_400_BAD_REQUEST, "Invalid Content-Length")
+                return
+            if int(value) > self.max_bytes:
+                await _send_error(send, status.HTTP_413_CONTENT_TOO_LARGE, "Request body too large")
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _send_error(send: Send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def open_audio_upload(upload: UploadFile) -> BinaryIO:
+    """
+    Validate an uploaded audio clip and return its spooled file, rewound.
+
+    Enforces ``audio_upload_max_bytes`` and ``audio_upload_max_seconds``.
+    Formats whose duration cannot be read from their metadata are rejected,
+    since their length could not be bounded.
+    """
+    audio = upload.file
+    size = upload.size
+    if size is None:
+        size = audio.seek(0, 2)
+    if size == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty audio upload")
+    if size > settings.audio_upload_max_bytes:
+        raise _too_large()
+
+    audio.seek(0)
+    duration = audio_duration(audio)
+    if duration is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported or unreadable audio; upload {', '.join(SUPPORTED_FORMATS)}",
+        )
+    if duration > settings.audio_upload_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Audio upload exceeds {settings.audio_upload_max_seconds:g} seconds",
+        )
+    return audio
@@ -1,5 +1,11 @@
 from app.context.base import BaseContextProvider
 from app.context.graph_rag import graph_rag_context_provider
+from app.context.summarizer import conversation_summarizer
 from app.context.summary import summary_context_provider
 
-__all__ = ["BaseContextProvider", "summary_context_provider", "graph_rag_context_provider"]
+__all__ = [
+    "BaseContextProvider",
+    "conversation_summarizer",
+    "summary_context_provider",
+    "graph_rag_context_provider",
+]
@@ -0,0 +1,140 @@
+"""
+Background conversation summarizer.
+
+Rolls each conversation's summary forward from ``Summary.last_message_id``
+once enough new messages have accumulated, so prompts carry a compact summary
+plus recent messages instead of an ever-growing history.
+"""
+
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.conversations.models import Message, Summary
+from app.conversations.service import after_message
+from app.database import async_session_maker
+from app.llm import LLMMessage
+from app.llm.tokens import estimate_message_tokens
+from app.providers import providers
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a \
+mental health companion. Update the existing summary with the new messages.
+
+Keep what matters for continuing the conversation with care:
+- What the user is going through, their feelings and any changes over time
+- People, events and circumstances they mentioned
+- Coping strategies discussed and what did or didn't help
+- Any mention of crisis or risk
+
+Write in the third person, in plain prose, in at most 300 words. Reply with the summary only."""
+
+
+class ConversationSummarizer:
+    """Schedules and runs summary updates outside the request path."""
+
+    def __init__(self):
+        self._running: dict[UUID, asyncio.Task] = {}
+
+    def schedule(self, conversation_id: UUID) -> None:
+        """Start a summary update for the conversation unless one is already running."""
+        if not settings.summary_enabled or conversation_id in self._running:
+            return
+        task = asyncio.create_task(self._run(conversation_id))
+        self._running[conversation_id] = task
+        task.add_done_callback(lambda _: self._running.pop(conversation_id, None))
+
+    def schedule_after_commit(self, db: AsyncSession, conversation_id: UUID) -> None:
+        """Schedule an update once db commits, so it sees the turn just written."""
+        event.listen(
+            db.sync_session, "after_commit", lambda _: self.schedule(conversation_id), once=True
+        )
+
+    async def aclose(self) -> None:
+        """Cancel in-flight updates; they are retried after the next turn."""
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, conversation_id: UUID) -> None:
+        try:
+            async with async_session_maker() as session:
+                if await self.update_summary(session, conversation_id):
+                    await session.commit()
+        except Exception:
+            logger.exception("Summarizing conversation %s failed", conversation_id)
+
+    async def update_summary(self, db: AsyncSession, conversation_id: UUID) -> Summary | None:
+        """
+        Fold messages newer than the latest summary into a new summary.
+
+        The most recent ``summary_keep_recent_messages`` messages are left out
+        so the prompt always has some of the conversation verbatim. Nothing is
+        written until the remaining messages reach ``summary_min_new_messages``
+        or ``summary_min_new_tokens``. At most ``summary_max_batch_messages``
+        messages and ``summary_max_batch_tokens`` tokens are folded per update;
+        the summary advances only that far and later updates pick up the rest.
+        """
+        result = await db.execute(
+            select(Summary)
+            .where(Summary.conv_id == conversation_id)
+            .order_by(Summary.created_at.desc())
+            .limit(1)
+        )
+        previous = result.scalar_one_or_none()
+
+        query = select(Message.id, Message.role, Message.content).where(
+            Message.conv_id == conversation_id
+        )
+        if previous and previous.last_message_id:
+            query = query.where(after_message(previous.last_message_id))
+        keep = settings.summary_keep_recent_messages
+        # With a full batch still followed by the kept messages, everything in
+        # the batch is older than the most recent ones
+        result = await db.execute(
+            query.order_by(Message.created_at, Message.id).limit(
+                settings.summary_max_batch_messages + keep
+            )
+        )
+        messages = result.all()
+
+        pending = messages[:-keep] if keep else messages
+        pending_tokens = 0
+        for count, (_, _, content) in enumerate(pending):
+            tokens = estimate_message_tokens(content)
+            if count and pending_tokens + tokens > settings.summary_max_batch_tokens:
+                pending = pending[:count]
+                break
+            pending_tokens += tokens
+        if not pending:
+            return None
+        if (
+            len(pending) < settings.summary_min_new_messages
+            and pending_tokens < settings.summary_min_new_tokens
+        ):
+            return None
+
+        transcript = "\n".join(f"{role.value}: {content}" for _, role, content in pending)
+        prompt = (
+            f"Existing summary:\n{previous.content if previous else '(none)'}\n\n"
+            f"New messages:\n{transcript}"
+        )
+        content = await providers.llm.chat(
+            [LLMMessage(role="user", content=prompt)], system_prompt=SUMMARY_PROMPT
+        )
+        if not content.strip():
+            return None
+
+        summary = Summary(conv_id=conversation_id, content=content, last_message_id=pending[-1][0])
+        db.add(summary)
+        await db.flush()
+        return summary
+
+
+conversation_summarizer = ConversationSummarizer()
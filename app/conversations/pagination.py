@@ -0,0 +1,32 @@
+"""
+Opaque keyset cursors.
+
+A cursor encodes the sort key of the last row of a page, a timestamp plus
+the row id as tie-breaker, so the next page is fetched with a row comparison
+against an index instead of an OFFSET scan.
+"""
+
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    payload = json.dumps([timestamp.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor from encode_cursor; raises 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp = datetime.fromisoformat(timestamp)
+        if timestamp.tzinfo is None:
+            raise ValueError("cursor timestamp must be timezone-aware")
+        return timestamp, UUID(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
@@ -8,49 +8,81 @@ from app.conversations.schemas import (
     ConversationResponse,
     ConversationUpdate,
     ConversationWithMessages,
+    MessagePage,
 )
 from app.conversations.service import (
     create_conversation,
     delete_conversation,
     get_conversation_by_id,
+    get_conversation_messages,
     get_conversations,
     update_conversation,
 )
-from app.dependencies import CurrentUser, DbSession
+from app.dependencies import CurrentUserId, DbSession, ReadCurrentUserId, ReadDbSession
 
 router = APIRouter()
 
 
 @router.post("", response_model=ConversationResponse, status_code=201)
-async def create_new_conversation(
-    db: DbSession, current_user: CurrentUser, data: ConversationCreate
-):
-    return await create_conversation(db, current_user.id, data)
+async def create_new_conversation(db: DbSession, user_id: CurrentUserId, data: ConversationCreate):
+    return await create_conversation(db, user_id, data)
 
 
 @router.get("", response_model=ConversationListResponse)
 async def list_conversations(
-    db: DbSession,
-    current_user: CurrentUser,
-    skip: int = Query(0, ge=0),
+    db: ReadDbSession,
+    user_id: ReadCurrentUserId,
+    cursor: str | None = None,
     limit: int = Query(50, ge=1, le=100),
+    include_total: bool = False,
 ):
-    conversations, total = await get_conversations(db, current_user.id, skip, limit)
-    return ConversationListResponse(conversations=conversations, total=total)
+    conversations, next_cursor, total = await get_conversations(
+        db, user_id, cursor, limit, include_total
+    )
+    return ConversationListResponse(
+        conversations=conversations, next_cursor=next_cursor, total=total
+    )
 
 
 @router.get("/{conversation_id}", response_model=ConversationWithMessages)
-async def get_conversation(db: DbSession, current_user: CurrentUser, conversation_id: UUID):
-    return await get_conversation_by_id(db, conversation_id, current_user.id)
+async def get_conversation(
+    db: ReadDbSession,
+    user_id: ReadCurrentUserId,
+    conversation_id: UUID,
+    limit: int = Query(50, ge=1, le=100),
+):
+    conversation = await get_conversation_by_id(db, conversation_id, user_id)
+    messages, next_cursor = await get_conversation_messages(
+        db, conversation_id, user_id, limit=limit, verify_owner=False
+    )
+    return ConversationWithMessages(
+        **ConversationResponse.model_validate(conversation).model_dump(),
+        messages=messages,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{conversation_id}/messages", response_model=MessagePage)
+async def list_messages(
+    db: ReadDbSession,
+    user_id: ReadCurrentUserId,
+    conversation_id: UUID,
+    before: str | None = None,
+    limit: int = Query(50, ge=1, le=100),
+):
+    messages, next_cursor = await get_conversation_messages(
+        db, conversation_id, user_id, before, limit
+    )
+    return MessagePage(messages=messages, next_cursor=next_cursor)
 
 
 @router.patch("/{conversation_id}", response_model=ConversationResponse)
 async def update_conversation_title(
-    db: DbSession, current_user: CurrentUser, conversation_id: UUID, data: ConversationUpdate
+    db: DbSession, user_id: CurrentUserId, conversation_id: UUID, data: ConversationUpdate
 ):
-    return await update_conversation(db, conversation_id, current_user.id, data)
+    return await update_conversation(db, conversation_id, user_id, data)
 
 
 @router.delete("/{conversation_id}", status_code=204)
-async def remove_conversation(db: DbSession, current_user: CurrentUser, conversation_id: UUID):
-    await delete_conversation(db, conversation_id, current_user.id)
+async def remove_conversation(db: DbSession, user_id: CurrentUserId, conversation_id: UUID):
+    await delete_conversation(db, conversation_id, user_id)
@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ConversationType(str, Enum):
@@ -43,7 +43,10 @@ class ConversationResponse(BaseModel):
 
 class ConversationListResponse(BaseModel):
     conversations: list[ConversationResponse]
-    total: int
+    # Pass as ``cursor`` to fetch the next page; None on the last page
+    next_cursor: str | None = None
+    # Only computed when requested with ``include_total``
+    total: int | None = None
 
 
 # Message schemas
@@ -60,14 +63,22 @@ class MessageResponse(BaseModel):
     content: str
     type: MessageType
     audio_url: str | None
-    metadata: dict | None
+    # Message.metadata is SQLAlchemy's MetaData; the column is msg_metadata
+    metadata: dict | None = Field(default=None, validation_alias="msg_metadata")
     created_at: datetime
 
     model_config = {"from_attributes": True}
 
 
-class ConversationWithMessages(ConversationResponse):
+class MessagePage(BaseModel):
+    # Chronological order
     messages: list[MessageResponse]
+    # Pass as ``before`` to fetch older messages; None once the first is reached
+    next_cursor: str | None = None
+
+
+class ConversationWithMessages(MessagePage, ConversationResponse):
+    """Conversation metadata with its latest page of messages."""
 
 
 # Summary schemas
@@ -1,12 +1,28 @@
-from uuid import UUID
+from datetime import timedelta
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, func, select
+from sqlalchemy import (
+    ColumnElement,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    null,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.conversations.models import Conversation, Message
+from app.conversations.models import Conversation, Message, MessageRole, MessageType, Summary
+from app.conversations.pagination import decode_cursor, encode_cursor
 from app.conversations.schemas import ConversationCreate, ConversationUpdate
+from app.database import recent_writes
 
 
 async def create_conversation(
@@ -15,37 +31,74 @@ async def create_conversation(
     conversation = Conversation(user_id=user_id, title=data.title, type=data.type)
     db.add(conversation)
     await db.flush()
+    recent_writes.mark(user_id)
     await db.refresh(conversation)
     return conversation
 
 
 async def get_conversations(
-    db: AsyncSession, user_id: UUID, skip: int = 0, limit: int = 50
-) -> tuple[list[Conversation], int]:
-    # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(Conversation).where(Conversation.user_id == user_id)
-    )
-    total = count_result.scalar() or 0
+    db: AsyncSession,
+    user_id: UUID,
+    cursor: str | None = None,
+    limit: int = 50,
+    include_total: bool = False,
+) -> tuple[list[Conversation], str | None, int | None]:
+    """
+    Get a page of the user's conversations, most recently updated first.
 
-    # Get conversations
-    result = await db.execute(
+    Pages are fetched by keyset on (updated_at, id), served by the
+    (user_id, updated_at, id) index, so every page costs the same.
+
+    Returns:
+        tuple: (conversations, cursor for the next page or None, total or None)
+    """
+    query = (
         select(Conversation)
         .where(Conversation.user_id == user_id)
-        .order_by(Conversation.updated_at.desc())
-        .offset(skip)
-        .limit(limit)
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(
+            tuple_(Conversation.updated_at, Conversation.id) < tuple_(*decode_cursor(cursor))
+        )
+    result = await db.execute(query)
+    conversations = list(result.scalars().all())
+
+    next_cursor = None
+    if len(conversations) > limit:
+        conversations = conversations[:limit]
+        last = conversations[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+
+    total = None
+    if include_total:
+        count_result = await db.execute(
+            select(func.count()).select_from(Conversation).where(Conversation.user_id == user_id)
+        )
+        total = count_result.scalar() or 0
+
+    return conversations, next_cursor, total
+
+
+async def verify_conversation_owner(db: AsyncSession, conversation_id: UUID, user_id: UUID) -> None:
+    """Raise 404 unless the conversation exists and belongs to the user, without loading it."""
+    result = await db.execute(
+        select(Conversation.id).where(
+            Conversation.id == conversation_id, Conversation.user_id == user_id
+        )
     )
-    return list(result.scalars().all()), total
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
 
 
 async def get_conversation_by_id(
     db: AsyncSession, conversation_id: UUID, user_id: UUID
 ) -> Conversation:
     result = await db.execute(
-        select(Conversation)
-        .options(selectinload(Conversation.messages))
-        .where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+        select(Conversation).where(
+            Conversation.id == conversation_id, Conversation.user_id == user_id
+        )
     )
     conversation = result.scalar_one_or_none()
     if not conversation:
@@ -56,10 +109,18 @@ async def get_conversation_by_id(
 async def update_conversation(
     db: AsyncSession, conversation_id: UUID, user_id: UUID, data: ConversationUpdate
 ) -> Conversation:
-    conversation = await get_conversation_by_id(db, conversation_id, user_id)
+    result = await db.execute(
+        select(Conversation).where(
+            Conversation.id == conversation_id, Conversation.user_id == user_id
+        )
+    )
+    conversation = result.scalar_one_or_none()
+    if not conversation:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
     if data.title is not None:
         conversation.title = data.title
     await db.flush()
+    recent_writes.mark(user_id)
     await db.refresh(conversation)
     return conversation
 
@@ -72,6 +133,7 @@ async def delete_conversation(db: AsyncSession, conversation_id: UUID, user_id:
     )
     if result.rowcount == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    recent_writes.mark(user_id)
 
 
 async def add_message(
@@ -83,34 +145,174 @@ async def add_message(
     msg_type: str = "text",
     audio_url: str | None = None,
     metadata: dict | None = None,
+    message_id: UUID | None = None,
+    verify_owner: bool = True,
 ) -> Message:
     # Verify conversation belongs to user
-    await get_conversation_by_id(db, conversation_id, user_id)
+    if verify_owner:
+        await verify_conversation_owner(db, conversation_id, user_id)
 
     message = Message(
+        id=message_id or uuid4(),
         conv_id=conversation_id,
         role=role,
         content=content,
         type=msg_type,
         audio_url=audio_url,
-        metadata=metadata,
+        msg_metadata=metadata,
     )
     db.add(message)
     await db.flush()
+    recent_writes.mark(user_id)
     await db.refresh(message)
     return message
 
 
+async def add_turn(
+    db: AsyncSession,
+    conversation_id: UUID,
+    user_id: UUID,
+    user_content: str,
+    assistant_content: str,
+    msg_type: str = "text",
+    user_metadata: dict | None = None,
+    assistant_message_id: UUID | None = None,
+) -> tuple[Message, Message]:
+    """
+    Save the user and assistant messages of a chat turn in a single statement.
+
+    A data-modifying CTE bumps ``Conversation.updated_at`` for the user's
+    conversation and the multi-row ``INSERT ... SELECT`` only produces rows
+    when that update matched, so ownership check, timestamp bump and both
+    inserts share one round trip. Both messages are stamped from a single
+    ``clock_timestamp()``, the assistant one a microsecond later, so the
+    assistant message always sorts after the user message.
+
+    Returns:
+        tuple: (user message, assistant message)
+    """
+    owned = (
+        update(Conversation)
+        .where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+        .values(updated_at=func.now())
+        .returning(Conversation.id)
+        .cte("owned")
+    )
+    now = select(func.clock_timestamp().label("ts")).cte("now")
+    columns = ["id", "conv_id", "role", "content", "type", "msg_metadata", "created_at"]
+    table = Message.__table__
+    rows = [
+        (uuid4(), MessageRole.user, user_content, user_metadata, now.c.ts),
+        (
+            assistant_message_id or uuid4(),
+            MessageRole.assistant,
+            assistant_content,
+            None,
+            now.c.ts + timedelta(microseconds=1),
+        ),
+    ]
+    values = union_all(
+        *(
+            select(
+                literal(message_id, table.c.id.type),
+                owned.c.id,
+                literal(role, table.c.role.type),
+                literal(content, table.c.content.type),
+                literal(MessageType(msg_type), table.c.type.type),
+                cast(null(), table.c.msg_metadata.type)
+                if metadata is None
+                else literal(metadata, table.c.msg_metadata.type),
+                created_at,
+            )
+            # Both CTEs return a single row
+            .select_from(owned.join(now, true()))
+            for message_id, role, content, metadata, created_at in rows
+        )
+    )
+    result = await db.scalars(
+        insert(Message).from_select(columns, values).returning(Message),
+        execution_options={"populate_existing": True},
+    )
+    messages = sorted(result.all(), key=lambda message: message.created_at)
+    if not messages:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    recent_writes.mark(user_id)
+    user_msg, assistant_msg = messages
+    return user_msg, assistant_msg
+
+
 async def get_conversation_messages(
-    db: AsyncSession, conversation_id: UUID, user_id: UUID, limit: int = 50
-) -> list[Message]:
+    db: AsyncSession,
+    conversation_id: UUID,
+    user_id: UUID,
+    before: str | None = None,
+    limit: int = 50,
+    verify_owner: bool = True,
+) -> tuple[list[Message], str | None]:
+    """
+    Get a page of messages, the latest ones or those older than a cursor.
+
+    Pages are fetched by keyset on (created_at, id), served by the
+    (conv_id, created_at, id) index.
+
+    Returns:
+        tuple: (messages in chronological order, cursor for older messages or None)
+    """
     # Verify conversation belongs to user
-    await get_conversation_by_id(db, conversation_id, user_id)
+    if verify_owner:
+        await verify_conversation_owner(db, conversation_id, user_id)
 
-    result = await db.execute(
+    query = (
         select(Message)
         .where(Message.conv_id == conversation_id)
-        .order_by(Message.created_at.desc())
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        query = query.where(tuple_(Message.created_at, Message.id) < tuple_(*decode_cursor(before)))
+    result = await db.execute(query)
+    messages = list(result.scalars().all())
+
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        oldest = messages[-1]
+        next_cursor = encode_cursor(oldest.created_at, oldest.id)
+
+    return list(reversed(messages)), next_cursor
+
+
+def after_message(message_id) -> ColumnElement[bool]:
+    """Condition matching messages ordered after message_id by (created_at, id)."""
+    boundary = select(Message.created_at, Message.id).where(Message.id == message_id)
+    return tuple_(Message.created_at, Message.id) > boundary.scalar_subquery()
+
+
+async def get_messages_since_summary(
+    db: AsyncSession, conversation_id: UUID, user_id: UUID, limit: int = 50
+) -> list[tuple[MessageRole, str]]:
+    """
+    Get the latest messages not yet covered by the conversation's summary.
+
+    Only the ``(role, content)`` columns are fetched, in chronological order.
+    Pairs with SummaryContextProvider, which supplies the summary itself.
+    """
+    await verify_conversation_owner(db, conversation_id, user_id)
+
+    latest_summary = (
+        select(Summary.last_message_id)
+        .where(Summary.conv_id == conversation_id)
+        .order_by(Summary.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(Message.role, Message.content)
+        .where(
+            Message.conv_id == conversation_id,
+            or_(latest_summary.is_(None), after_message(latest_summary)),
+        )
+        .order_by(Message.created_at.desc(), Message.id.desc())
         .limit(limit)
     )
-    return list(reversed(result.scalars().all()))
+    return [(role, content) for role, content in reversed(result.all())]
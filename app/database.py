@@ -1,13 +1,207 @@
+import time
 from collections.abc import AsyncGenerator
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.metrics import Counter, Gauge, db_query_seconds
 
-engine = create_async_engine(settings.database_url, echo=settings.debug)
+
+class PoolStats:
+    """Counters for connection checkouts from an InstrumentedPool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection.
+
+    Wait time covers blocking on an exhausted pool as well as opening a new
+    connection, which is what a request actually stalls on.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.stats.checkouts += 1
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+
+    def recreate(self) -> "InstrumentedPool":
+        # Keep counting across engine.dispose()
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    if settings.db_pgbouncer_mode:
+        # PgBouncer in transaction mode moves sessions between server
+        # connections, so prepared statements must be neither cached nor
+        # reused by name
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    engine = create_async_engine(
+        url,
+        echo=settings.debug,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_query_seconds.observe(time.perf_counter() - context._query_start)
+
+
+engine = _create_engine(settings.database_url)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engine = (
+    _create_engine(settings.database_replica_url) if settings.database_replica_url else None
+)
+replica_session_maker = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+
+class RecentWrites:
+    """
+    Users who wrote to the primary within the last few seconds.
+
+    Their reads skip the replica until it has had time to catch up. Like the
+    user cache this is per process, so it assumes a user's requests reach the
+    same worker; anything else falls back to the replica's lag.
+    """
+
+    def __init__(self, window_seconds: float, enabled: bool):
+        self.window_seconds = window_seconds
+        self.enabled = enabled
+        self._written_at: dict[str, float] = {}
+
+    def mark(self, key: object) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if len(self._written_at) >= 10_000:
+            cutoff = now - self.window_seconds
+            self._written_at = {k: t for k, t in self._written_at.items() if t > cutoff}
+        self._written_at[str(key)] = now
+
+    def is_recent(self, key: object) -> bool:
+        written_at = self._written_at.get(str(key))
+        return written_at is not None and time.monotonic() - written_at < self.window_seconds
+
+
+recent_writes = RecentWrites(
+    settings.replica_read_your_writes_seconds, enabled=replica_engine is not None
+)
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    """Live occupancy and checkout statistics of an engine's pool."""
+    pool = engine.pool
+    stats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(stats.wait_seconds_max, 6),
+    }
+
+
+def _engines() -> dict[str, AsyncEngine]:
+    engines = {"primary": engine}
+    if replica_engine is not None:
+        engines["replica"] = replica_engine
+    return engines
+
+
+def _collect_pool_connections() -> dict[tuple[str, ...], float]:
+    values = {}
+    for name, pooled in _engines().items():
+        status = pool_status(pooled)
+        values[(name, "checked_in")] = status["checked_in"]
+        values[(name, "checked_out")] = status["checked_out"]
+        values[(name, "overflow")] = status["overflow"]
+    return values
+
+
+Gauge(
+    "db_pool_connections",
+    "Connections in the pool by state.",
+    ("pool", "state"),
+    collect=_collect_pool_connections,
+)
+Counter(
+    "db_pool_checkout_wait_seconds_total",
+    "Time spent waiting to check out a connection.",
+    ("pool",),
+    collect=lambda: {(n,): e.pool.stats.wait_seconds_total for n, e in _engines().items()},
+)
+Counter(
+    "db_pool_checkouts_total",
+    "Connection checkouts.",
+    ("pool",),
+    collect=lambda: {(n,): e.pool.stats.checkouts for n, e in _engines().items()},
+)
+Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that timed out waiting for a connection.",
+    ("pool",),
+    collect=lambda: {(n,): e.pool.stats.timeouts for n, e in _engines().items()},
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -21,3 +215,18 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+
+
+async def get_read_db(user_key: object = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only work, on the replica when one is configured.
+
+    Falls back to the primary for a user_key marked in recent_writes, so
+    users always read their own writes.
+    """
+    if replica_session_maker is None or recent_writes.is_recent(user_key):
+        session_maker = async_session_maker
+    else:
+        session_maker = replica_session_maker
+    async with session_maker() as session:
+        yield session
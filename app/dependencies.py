@@ -1,4 +1,6 @@
+from collections.abc import AsyncGenerator
 from typing import Annotated
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -7,35 +9,105 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.users.cache import user_cache
 from app.users.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _get_token_subject(token: str) -> str:
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         user_id: str | None = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user_id
+
+
+async def _resolve_user(db: AsyncSession, user_id: str) -> User:
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
 
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    # Detach so the cached instance isn't tied to this request's session
+    db.expunge(user)
+    user_cache.set(user_id, user)
     return user
 
 
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
+    return await _resolve_user(db, _get_token_subject(token))
+
+
+async def _resolve_user_id(db: AsyncSession, token: str) -> UUID:
+    user_id = _get_token_subject(token)
+    if settings.auth_trust_token_claims:
+        try:
+            return UUID(user_id)
+        except ValueError:
+            raise _credentials_exception()
+    return (await _resolve_user(db, user_id)).id
+
+
+async def get_current_user_id(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> UUID:
+    """
+    Resolve only the authenticated user's id.
+
+    With ``auth_trust_token_claims`` enabled the verified token subject is
+    used as-is, without checking that the user still exists.
+    """
+    return await _resolve_user_id(db, token)
+
+
+async def get_user_read_db(
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session for the authenticated user (see get_read_db)."""
+    async for session in get_read_db(_get_token_subject(token)):
+        yield session
+
+
+async def get_current_user_from_read_db(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_user_read_db)],
+) -> User:
+    return await _resolve_user(db, _get_token_subject(token))
+
+
+async def get_current_user_id_from_read_db(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_user_read_db)],
+) -> UUID:
+    """Like get_current_user_id, but resolves the user through the read session."""
+    return await _resolve_user_id(db, token)
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUserId = Annotated[UUID, Depends(get_current_user_id)]
+ReadCurrentUser = Annotated[User, Depends(get_current_user_from_read_db)]
+ReadCurrentUserId = Annotated[UUID, Depends(get_current_user_id_from_read_db)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+# For endpoints that only read; may be served by the replica
+ReadDbSession = Annotated[AsyncSession, Depends(get_user_read_db)]
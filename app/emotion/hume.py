@@ -5,10 +5,13 @@ Note: This is a simplified implementation. Full Hume.ai integration
 requires their SDK and proper audio streaming setup.
 """
 
+from typing import BinaryIO
+
 import httpx
 
 from app.config import settings
 from app.emotion.schemas import EmotionResult, EmotionScore
+from app.metrics import instrument_provider
 
 
 class HumeEmotionDetector:
@@ -18,12 +21,13 @@ class HumeEmotionDetector:
         self.api_key = settings.hume_api_key
         self.base_url = "https://api.hume.ai/v0"
 
-    async def detect_from_audio(self, audio_data: bytes) -> EmotionResult | None:
+    @instrument_provider("hume", "detect_emotion")
+    async def detect_from_audio(self, audio_data: bytes | BinaryIO) -> EmotionResult | None:
         """
         Analyze audio for emotional content.
 
         Args:
-            audio_data: Audio bytes to analyze
+            audio_data: Audio bytes, or a file object positioned at the start
 
         Returns:
             EmotionResult with detected emotions, or None if unavailable
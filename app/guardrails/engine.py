@@ -0,0 +1,121 @@
+"""
+Off-loop guardrails-ai validation.
+
+guardrails-ai validators are synchronous and hub validators such as
+ToxicLanguage run model inference, so each configured validator gets its own
+Guard, built lazily on first use and run on a dedicated thread pool. Results
+are cached by a hash of the text, and a validator that exceeds its timeout or
+fails to load is resolved by the configured fallback policy instead of
+failing the request.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from guardrails import Guard
+from guardrails.errors import ValidationError
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_ALLOW = "allow"
+FALLBACK_BLOCK = "block"
+
+
+class GuardrailsEngine:
+    """Runs named guardrails-ai hub validators concurrently in a worker pool."""
+
+    def __init__(
+        self,
+        validators: list[str],
+        timeout_seconds: float,
+        fallback: str,
+        max_workers: int,
+        cache_size: int,
+    ):
+        self.validators = validators
+        self.timeout_seconds = timeout_seconds
+        self.fallback = fallback
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._executor: ThreadPoolExecutor | None = None
+        self._guards: dict[str, Guard] = {}
+        self._guards_lock = threading.Lock()
+        self._cache: OrderedDict[str, tuple[bool, str | None]] = OrderedDict()
+
+    def _guard(self, name: str) -> Guard:
+        """Build the Guard for a hub validator on first use (runs in the pool)."""
+        with self._guards_lock:
+            guard = self._guards.get(name)
+            if guard is None:
+                import guardrails.hub
+
+                validator = getattr(guardrails.hub, name)
+                guard = self._guards[name] = Guard().use(validator(on_fail="exception"))
+            return guard
+
+    def _run(self, name: str, text: str) -> tuple[bool, str | None]:
+        try:
+            self._guard(name).validate(text)
+        except ValidationError as e:
+            return False, str(e)
+        return True, None
+
+    def _on_error(self, name: str, reason: str) -> tuple[bool, str | None, bool]:
+        logger.warning("Guardrails validator %s %s; applying %s", name, reason, self.fallback)
+        if self.fallback == FALLBACK_BLOCK:
+            return False, f"{name} validator unavailable", False
+        return True, None, False
+
+    async def _validate_with(self, name: str, text: str) -> tuple[bool, str | None, bool]:
+        """Run one validator; the last item says whether the result may be cached."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._run, name, text)
+        try:
+            is_valid, error = await asyncio.wait_for(future, self.timeout_seconds)
+        except TimeoutError:
+            return self._on_error(name, f"timed out after {self.timeout_seconds}s")
+        except Exception as e:
+            return self._on_error(name, f"failed: {e!r}")
+        return is_valid, error, True
+
+    async def validate(self, text: str) -> tuple[bool, str | None]:
+        """
+        Validate text against every configured validator.
+
+        Returns:
+            tuple: (is_valid, error_message or None)
+        """
+        if not self.validators:
+            return True, None
+
+        key = hashlib.sha256(text.encode()).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="guardrails"
+            )
+        results = await asyncio.gather(
+            *(self._validate_with(name, text) for name in self.validators)
+        )
+        is_valid, error, _ = next((r for r in results if not r[0]), (True, None, True))
+
+        # Fallback decisions are not cached so the text is re-checked next time
+        if all(cacheable for _, _, cacheable in results):
+            self._cache[key] = (is_valid, error)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return is_valid, error
+
+    def shutdown(self) -> None:
+        """Stop the worker pool; queued validations are abandoned."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
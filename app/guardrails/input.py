@@ -4,10 +4,9 @@ Input guardrails for content moderation.
 Uses guardrails-ai library for input validation and safety checks.
 """
 
-from guardrails import Guard
-
-# from guardrails.hub import ToxicLanguage
 from app.config import settings
+from app.guardrails.engine import GuardrailsEngine
+from app.guardrails.lexicon import crisis_matcher
 
 
 class InputGuardrails:
@@ -15,8 +14,14 @@ class InputGuardrails:
 
     def __init__(self):
         self.enabled = settings.guardrails_enabled
-        if self.enabled:
-            self.guard = Guard()
+        # Validators are built on first use, not at import time
+        self.engine = GuardrailsEngine(
+            settings.guardrails_input_validators,
+            timeout_seconds=settings.guardrails_validator_timeout_seconds,
+            fallback=settings.guardrails_validator_fallback,
+            max_workers=settings.guardrails_max_concurrency,
+            cache_size=settings.guardrails_cache_max_size,
+        )
 
     async def validate(self, text: str) -> tuple[bool, str | None]:
         """
@@ -28,25 +33,11 @@ class InputGuardrails:
         if not self.enabled:
             return True, None
 
-        try:
-            self.guard.validate(text)
-            return True, None
-        except Exception as e:
-            return False, str(e)
+        return await self.engine.validate(text)
 
     async def check_crisis_keywords(self, text: str) -> bool:
         """Check for crisis-related keywords that may need immediate attention."""
-        crisis_keywords = [
-            "suicide",
-            "kill myself",
-            "end my life",
-            "want to die",
-            "self-harm",
-            "hurt myself",
-            "no reason to live",
-        ]
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in crisis_keywords)
+        return crisis_matcher.matches(text)
 
 
 input_guardrails = InputGuardrails()
@@ -0,0 +1,138 @@
+"""
+Compiled phrase lexicons for the guardrails.
+
+A lexicon is a set of phrases matched as normalized substrings. The phrases
+are merged into a trie and emitted as a single compiled regex, so a scan is
+one pass over the text however many phrases the lexicon holds, instead of
+one pass per phrase.
+
+Lexicon files are UTF-8 text with one phrase per line; blank lines and lines
+starting with ``#`` are ignored.
+"""
+
+import re
+import unicodedata
+from collections.abc import Iterable
+from pathlib import Path
+
+from app.config import settings
+
+CRISIS_PHRASES = (
+    # English
+    "suicide",
+    "kill myself",
+    "end my life",
+    "want to die",
+    "self-harm",
+    "self harm",
+    "hurt myself",
+    "no reason to live",
+    # Hindi
+    "आत्महत्या",
+    "ख़ुदकुशी",
+    "खुदकुशी",
+    "मरना चाहता हूं",
+    "मरना चाहती हूं",
+    "खुद को मार",
+    "जीने का कोई मतलब नहीं",
+    # Romanized Hindi
+    "khudkushi",
+    "aatmahatya",
+    "marna chahta hoon",
+    "marna chahti hoon",
+)
+
+HARMFUL_OUTPUT_PHRASES = (
+    "you should stop taking your medication",
+    "don't tell anyone",
+    "keep this a secret",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+# Typographic variants that NFKC leaves alone but LLMs and keyboards emit
+_PUNCTUATION = str.maketrans(
+    {
+        "‐": "-",
+        "‑": "-",
+        "‒": "-",
+        "–": "-",
+        "—": "-",
+        "‘": "'",
+        "’": "'",
+        "ʼ": "'",
+    }
+)
+
+
+def normalize(text: str) -> str:
+    """NFKC-normalize, casefold and collapse whitespace for matching."""
+    text = unicodedata.normalize("NFKC", text).casefold().translate(_PUNCTUATION)
+    return _WHITESPACE.sub(" ", text)
+
+
+def _trie_pattern(node: dict) -> str | None:
+    """Render a trie node as a regex that matches exactly its suffixes."""
+    if list(node) == [""]:
+        return None
+    optional = "" in node
+    branches = []
+    chars = []
+    for char in sorted(key for key in node if key):
+        suffix = _trie_pattern(node[char])
+        if suffix is None:
+            chars.append(re.escape(char))
+        else:
+            branches.append(re.escape(char) + suffix)
+    only_chars = not branches
+    if chars:
+        branches.append(chars[0] if len(chars) == 1 else f"[{''.join(chars)}]")
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if optional:
+        pattern = f"{pattern}?" if only_chars else f"(?:{pattern})?"
+    return pattern
+
+
+class PhraseMatcher:
+    """Matches any of a set of phrases against normalized text in one pass."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = frozenset(p for p in map(normalize, phrases) if p.strip())
+        # Longest phrase in characters, for callers that scan text incrementally
+        self.max_phrase_length = max(map(len, self.phrases), default=0)
+
+        trie: dict = {}
+        for phrase in self.phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        pattern = _trie_pattern(trie) if trie else None
+        self._regex = re.compile(pattern) if pattern else None
+
+    def search(self, text: str) -> str | None:
+        """Return the first phrase found in text, or None."""
+        if self._regex is None:
+            return None
+        match = self._regex.search(normalize(text))
+        return match.group() if match else None
+
+    def matches(self, text: str) -> bool:
+        """Return whether any phrase occurs in text."""
+        return self.search(text) is not None
+
+
+def load_lexicon(paths: Iterable[str]) -> list[str]:
+    """Read phrases from lexicon files."""
+    phrases = []
+    for path in paths:
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                phrases.append(line)
+    return phrases
+
+
+crisis_matcher = PhraseMatcher([*CRISIS_PHRASES, *load_lexicon(settings.crisis_lexicon_paths)])
+harmful_output_matcher = PhraseMatcher(
+    [*HARMFUL_OUTPUT_PHRASES, *load_lexicon(settings.harmful_output_lexicon_paths)]
+)
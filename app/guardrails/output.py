@@ -5,6 +5,44 @@ Ensures LLM responses are safe and appropriate for mental health context.
 """
 
 from app.config import settings
+from app.guardrails.lexicon import PhraseMatcher, harmful_output_matcher, normalize
+
+# Appended after a separator when the user's message triggers crisis detection
+CRISIS_RESOURCES = (
+    "If you're in crisis or need immediate support, please reach out:\n"
+    "- National Suicide Prevention Lifeline: 988\n"
+    "- Crisis Text Line: Text HOME to 741741\n"
+    "- International Association for Suicide Prevention: https://www.iasp.info/resources/Crisis_Centres/"
+)
+
+
+class StreamingValidator:
+    """
+    Validates a streamed LLM response chunk by chunk.
+
+    Each chunk is scanned together with the tail of the text before it, kept
+    just long enough that a phrase split across chunks is still found, so a
+    violation is reported as soon as the chunk completing it arrives.
+    """
+
+    def __init__(self, matcher: PhraseMatcher, enabled: bool = True):
+        self.matcher = matcher
+        self.enabled = enabled
+        self._overlap = max(matcher.max_phrase_length - 1, 0)
+        # Normalized, so collapsed whitespace cannot stretch a phrase past it
+        self._tail = ""
+        self.error: str | None = None
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next chunk; returns False once the response is invalid."""
+        if not self.enabled or self.error is not None:
+            return self.error is None
+        window = normalize(self._tail + chunk)
+        if self.matcher.matches(window):
+            self.error = "Response contained potentially harmful content"
+            return False
+        self._tail = window[-self._overlap :] if self._overlap else ""
+        return True
 
 
 class OutputGuardrails:
@@ -24,32 +62,21 @@ class OutputGuardrails:
             return True, None
 
         # Check for harmful advice patterns
-        harmful_patterns = [
-            "you should stop taking your medication",
-            "don't tell anyone",
-            "keep this a secret",
-        ]
-
-        text_lower = text.lower()
-        for pattern in harmful_patterns:
-            if pattern in text_lower:
-                return False, f"Response contained potentially harmful content"
+        if harmful_output_matcher.matches(text):
+            return False, f"Response contained potentially harmful content"
 
         return True, None
 
+    def stream_validator(self) -> StreamingValidator:
+        """Create a validator for one streamed response."""
+        return StreamingValidator(harmful_output_matcher, enabled=self.enabled)
+
     async def add_crisis_resources(self, text: str, is_crisis: bool) -> str:
         """Append crisis resources if needed."""
         if not is_crisis:
             return text
 
-        crisis_message = (
-            "\n\n---\n"
-            "If you're in crisis or need immediate support, please reach out:\n"
-            "- National Suicide Prevention Lifeline: 988\n"
-            "- Crisis Text Line: Text HOME to 741741\n"
-            "- International Association for Suicide Prevention: https://www.iasp.info/resources/Crisis_Centres/"
-        )
-        return text + crisis_message
+        return text + "\n\n---\n" + CRISIS_RESOURCES
 
 
 output_guardrails = OutputGuardrails()
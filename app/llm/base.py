@@ -3,6 +3,8 @@ from collections.abc import AsyncGenerator
 
 
 class LLMMessage:
+    __slots__ = ("role", "content")
+
     def __init__(self, role: str, content: str):
         self.role = role
         self.content = content
@@ -25,3 +27,7 @@ class BaseLLM(ABC):
     ) -> AsyncGenerator[str, None]:
         """Stream response tokens from LLM."""
         pass
+
+    async def aclose(self) -> None:
+        """Release any network resources held by the provider."""
+        pass
@@ -1,22 +1,56 @@
 import asyncio
-from collections.abc import AsyncGenerator
+import itertools
+import logging
+import random
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import aclosing
+from typing import TypeVar
 
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from app.config import settings
 from app.llm.base import BaseLLM, LLMMessage
+from app.llm.resilience import LatencyTracker, RetryBudget, hedged, timed
+from app.metrics import instrument_provider, provider_hedges, provider_retries
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, TimeoutError | httpx.TransportError)
+
+
+def _create_client(location: str) -> genai.Client:
+    return genai.Client(
+        vertexai=True,
+        project=settings.google_cloud_project,
+        location=location,
+    )
 
 
 class GeminiLLM(BaseLLM):
     def __init__(self, model: str = "gemini-2.5-flash"):
-        print(settings)
-        self.client = genai.Client(
-            vertexai=True,
-            project=settings.google_cloud_project,
-            location=settings.google_cloud_location,
-        )
+        self.client = _create_client(settings.google_cloud_location)
+        self._hedge_clients = [
+            _create_client(location) for location in settings.gemini_hedge_locations
+        ]
+        self._next_hedge_client = itertools.cycle(self._hedge_clients or [self.client])
         self.model = model
+        self.timeout_seconds = settings.gemini_timeout_seconds
+        self.attempt_timeout_seconds = settings.gemini_attempt_timeout_seconds
+        self.max_retries = settings.gemini_max_retries
+        self.hedge_percentile = settings.gemini_hedge_percentile
+        self._retry_budget = RetryBudget(settings.gemini_retry_budget_ratio)
+        # For streams, the latency tracked is the time to the first chunk
+        self._latencies = {"chat": LatencyTracker(), "chat_stream": LatencyTracker()}
 
     def _build_contents(self, messages: list[LLMMessage]) -> list[types.Content]:
         contents = []
@@ -25,30 +59,101 @@ class GeminiLLM(BaseLLM):
             contents.append(types.Content(role=role, parts=[types.Part(text=msg.content)]))
         return contents
 
+    async def aclose(self) -> None:
+        for client in [self.client, *self._hedge_clients]:
+            await client.aio.aclose()
+            client.close()
+
+    async def _call(
+        self,
+        operation: str,
+        attempt: Callable[[genai.Client], Awaitable[T]],
+        discard: Callable[[T], Awaitable[None]] | None = None,
+    ) -> T:
+        """
+        Run attempt against the primary location with a per-attempt deadline.
+
+        Slow attempts are hedged once hedging is enabled and enough latencies
+        have been seen; retryable failures are retried with jittered backoff
+        while the retry budget allows.
+        """
+        latencies = self._latencies[operation]
+        self._retry_budget.record_request()
+        for retry in itertools.count():
+            delay = latencies.percentile(self.hedge_percentile) if self.hedge_percentile else None
+            try:
+                return await asyncio.wait_for(
+                    hedged(
+                        lambda: timed(attempt(self.client), latencies),
+                        lambda: timed(attempt(next(self._next_hedge_client)), latencies),
+                        delay,
+                        on_hedge=lambda: provider_hedges.inc(
+                            provider="gemini", operation=operation
+                        ),
+                        discard=discard,
+                    ),
+                    self.attempt_timeout_seconds,
+                )
+            except Exception as e:
+                if (
+                    retry >= self.max_retries
+                    or not _is_retryable(e)
+                    or not self._retry_budget.try_spend()
+                ):
+                    raise
+                provider_retries.inc(provider="gemini", operation=operation)
+                logger.warning("Gemini %s failed, retrying: %r", operation, e)
+                await asyncio.sleep(random.uniform(0, 0.25 * 2**retry))
+
+    @instrument_provider("gemini", "chat")
     async def chat(self, messages: list[LLMMessage], system_prompt: str | None = None) -> str:
         config = types.GenerateContentConfig(
             system_instruction=system_prompt or "",
         )
-        response = await self.client.aio.models.generate_content(
-            model=self.model,
-            contents=self._build_contents(messages),
-            config=config,
-        )
+        contents = self._build_contents(messages)
+        async with asyncio.timeout(self.timeout_seconds):
+            response = await self._call(
+                "chat",
+                lambda client: client.aio.models.generate_content(
+                    model=self.model, contents=contents, config=config
+                ),
+            )
         return response.text or ""
 
+    async def _open_stream(
+        self,
+        client: genai.Client,
+        contents: list[types.Content],
+        config: types.GenerateContentConfig,
+    ) -> tuple[AsyncGenerator, types.GenerateContentResponse | None]:
+        """Start a stream and wait for its first chunk, so attempts can be retried or hedged."""
+        stream = await client.aio.models.generate_content_stream(
+            model=self.model, contents=contents, config=config
+        )
+        return stream, await anext(stream, None)
+
+    @instrument_provider("gemini", "chat_stream")
     async def chat_stream(
         self, messages: list[LLMMessage], system_prompt: str | None = None
     ) -> AsyncGenerator[str, None]:
         config = types.GenerateContentConfig(
             system_instruction=system_prompt or "",
         )
-        async for chunk in await self.client.aio.models.generate_content_stream(
-            model=self.model,
-            contents=self._build_contents(messages),
-            config=config,
-        ):
-            if chunk.text:
-                yield chunk.text
+        contents = self._build_contents(messages)
+        async with asyncio.timeout(self.timeout_seconds):
+            stream, chunk = await self._call(
+                "chat_stream",
+                lambda client: self._open_stream(client, contents, config),
+                # A hedged stream that opened alongside the winner is closed unused
+                discard=lambda opened: opened[0].aclose(),
+            )
+        # Once text has been yielded the stream can no longer be retried, so
+        # only stalls between chunks are bounded from here on
+        async with aclosing(stream):
+            while chunk is not None:
+                if chunk.text:
+                    yield chunk.text
+                chunk = await asyncio.wait_for(anext(stream, None), self.attempt_timeout_seconds)
 
 
 async def main():
@@ -0,0 +1,43 @@
+"""Token-budgeted prompt assembly."""
+
+from collections.abc import Sequence
+
+from app.llm.base import LLMMessage
+from app.llm.tokens import estimate_message_tokens, estimate_tokens
+
+
+def build_prompt(
+    system_prompt: str,
+    context: str,
+    history: Sequence[tuple[str, str]],
+    user_message: str,
+    token_budget: int,
+) -> tuple[str, list[LLMMessage]]:
+    """
+    Pack system prompt, context and history into a token budget.
+
+    The system prompt, context and new user message are always included;
+    history fills whatever budget remains, newest messages first, so a few
+    long messages or many short ones both make the best use of the window.
+
+    Args:
+        history: (role, content) pairs in chronological order
+
+    Returns:
+        tuple: (system prompt with context, messages ending with the user message)
+    """
+    if context:
+        system_prompt += f"\n\nContext:\n{context}"
+
+    remaining = (
+        token_budget - estimate_tokens(system_prompt) - estimate_message_tokens(user_message)
+    )
+    kept: list[LLMMessage] = []
+    for role, content in reversed(history):
+        remaining -= estimate_message_tokens(content)
+        if remaining < 0:
+            break
+        kept.append(LLMMessage(role=role, content=content))
+    kept.reverse()
+    kept.append(LLMMessage(role="user", content=user_message))
+    return system_prompt, kept
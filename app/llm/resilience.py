@@ -0,0 +1,129 @@
+"""
+Deadline, retry and hedging helpers for LLM calls.
+
+A retry budget caps retries at a fraction of recent requests, so a provider
+outage does not multiply the load sent to it. Hedging sends a second request
+once the first has been outstanding longer than a recent latency percentile
+and keeps whichever finishes first, which trims the tail caused by a few stuck
+calls at the cost of a few percent extra requests.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class RetryBudget:
+    """Token bucket refilled by requests and drained by retries."""
+
+    def __init__(self, ratio: float, min_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = min_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False if it is exhausted."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, window: int = 1000, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """The q-th quantile (0-1) of the window, or None until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = math.ceil(q * len(ordered)) - 1
+        return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+async def timed(call: Awaitable[T], latencies: LatencyTracker) -> T:
+    """
+    Await a call, recording its latency.
+
+    Calls cut off by a deadline or by a faster hedge are recorded at the time
+    they had taken so far, a lower bound, so slow calls still raise the
+    percentiles. Calls that fail outright are not recorded.
+    """
+    start = time.perf_counter()
+    try:
+        result = await call
+    except (TimeoutError, asyncio.CancelledError):
+        latencies.observe(time.perf_counter() - start)
+        raise
+    latencies.observe(time.perf_counter() - start)
+    return result
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[T]],
+    hedge: Callable[[], Awaitable[T]],
+    delay: float | None,
+    on_hedge: Callable[[], None] | None = None,
+    discard: Callable[[T], Awaitable[None]] | None = None,
+) -> T:
+    """
+    Run primary, and also hedge if primary has not finished after delay seconds.
+
+    Returns the first successful result and cancels the other call; if both
+    succeed at once, the unused result is passed to discard so resources it
+    holds can be released. If both fail, the primary's exception is raised.
+    A delay of None disables hedging.
+    """
+    if delay is None:
+        return await primary()
+    first = asyncio.ensure_future(primary())
+    tasks = {first}
+    winner = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            winner = first
+            return first.result()
+        if on_hedge is not None:
+            on_hedge()
+        tasks.add(asyncio.ensure_future(hedge()))
+        while True:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                winner = succeeded[0]
+                return winner.result()
+            if not pending:
+                raise first.exception()
+            tasks = pending
+    finally:
+        for task in tasks:
+            task.cancel()
+        if discard is not None:
+            for task in tasks:
+                if (
+                    task is not winner
+                    and task.done()
+                    and not task.cancelled()
+                    and task.exception() is None
+                ):
+                    await discard(task.result())
@@ -0,0 +1,20 @@
+"""Fast local token estimation for prompt budgeting."""
+
+# Fixed cost of a message's role and turn markers
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in ``text`` without calling a tokenizer.
+
+    Uses roughly four UTF-8 bytes per token. That matches English prose
+    closely and charges Indic and other non-Latin scripts, which encode to
+    more bytes and more tokens per character, proportionally more.
+    """
+    return (len(text.encode()) + 3) // 4
+
+
+def estimate_message_tokens(content: str) -> int:
+    """Estimate the tokens a chat message costs, including its overhead."""
+    return estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
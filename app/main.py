@@ -1,19 +1,33 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
 from app.auth.router import router as auth_router
+from app.chat.handlers.voice import prerender_fixed_phrases
 from app.chat.router import router as chat_router
+from app.chat.uploads import MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware
 from app.config import settings
+from app.context import conversation_summarizer
 from app.conversations.router import router as conversations_router
+from app.database import engine, pool_status, replica_engine
+from app.guardrails import input_guardrails
+from app.metrics import CONTENT_TYPE, registry
+from app.profiling import ProfilingMiddleware
+from app.providers import providers
 from app.users.router import router as users_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await providers.startup()
+    if settings.speech_cache_enabled:
+        await prerender_fixed_phrases()
     yield
     # Shutdown
+    await conversation_summarizer.aclose()
+    await providers.shutdown()
+    input_guardrails.engine.shutdown()
 
 
 app = FastAPI(
@@ -23,6 +37,22 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path_prefixes=("/chat/voice",),
+    max_bytes=settings.audio_upload_max_bytes + MULTIPART_OVERHEAD_BYTES,
+)
+if settings.profiling_sample_rate > 0 or settings.profiling_admin_token:
+    app.add_middleware(
+        ProfilingMiddleware,
+        path_prefixes=tuple(settings.profiling_path_prefixes),
+        sample_rate=settings.profiling_sample_rate,
+        admin_token=settings.profiling_admin_token,
+        output_dir=settings.profiling_output_dir,
+        max_files=settings.profiling_max_files,
+        interval_seconds=settings.profiling_interval_seconds,
+    )
+
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 app.include_router(users_router, prefix="/users", tags=["Users"])
@@ -33,3 +63,17 @@ app.include_router(chat_router, prefix="/chat", tags=["Chat"])
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/db")
+async def database_health_check():
+    return {
+        "status": "healthy",
+        "pool": pool_status(engine),
+        "replica_pool": pool_status(replica_engine) if replica_engine is not None else None,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,285 @@
+"""
+Prometheus-format metrics for the chat pipeline.
+
+A deliberately small in-process implementation of counters, gauges and
+histograms rendered in the Prometheus text exposition format by GET
+/metrics. Metrics are only updated from the event loop thread, so they need
+no locking. Values are per worker process; label each worker's scrape target
+accordingly.
+"""
+
+import functools
+import inspect
+import math
+import time
+from collections.abc import Callable, Iterator
+from contextlib import aclosing, contextmanager
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = [*zip(labelnames, values, strict=True), *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple[str, ...], float]] | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict = {}
+        # Reads the current values at scrape time instead of tracking them
+        self._collect = collect
+        registry.register(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type}\n"
+        return header + "".join(f"{sample}\n" for sample in self.samples())
+
+
+class _SimpleMetric(Metric):
+    def samples(self) -> Iterator[str]:
+        values = self._collect() if self._collect is not None else self._values
+        for key, value in values.items():
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Counter(_SimpleMetric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_SimpleMetric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), math.inf)
+        # Per label set: (per-bucket counts, [sum])
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * len(self.buckets), [0.0])
+        counts, total = entry
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts, strict=True):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Chat pipeline
+chat_turn_seconds = Histogram(
+    "chat_turn_duration_seconds",
+    "Duration of a chat turn; for streamed turns, from the start of setup to the last event.",
+    ("mode",),
+)
+chat_turns_in_flight = Gauge("chat_turns_in_flight", "Chat turns being processed.", ("mode",))
+chat_turn_errors = Counter("chat_turn_errors_total", "Chat turns that raised.", ("mode",))
+chat_stage_seconds = Histogram(
+    "chat_stage_duration_seconds", "Duration of each chat pipeline stage.", ("stage",)
+)
+chat_stage_errors = Counter(
+    "chat_stage_errors_total", "Chat pipeline stages that raised.", ("stage",)
+)
+
+# External providers
+provider_request_seconds = Histogram(
+    "provider_request_duration_seconds",
+    "Duration of calls to LLM, speech and emotion providers.",
+    ("provider", "operation"),
+)
+provider_requests_in_flight = Gauge(
+    "provider_requests_in_flight", "Provider calls in progress.", ("provider", "operation")
+)
+provider_errors = Counter(
+    "provider_errors_total", "Provider calls that raised.", ("provider", "operation")
+)
+provider_retries = Counter(
+    "provider_retries_total", "Provider calls retried after a failure.", ("provider", "operation")
+)
+provider_hedges = Counter(
+    "provider_hedged_requests_total",
+    "Second requests sent because the first was slow.",
+    ("provider", "operation"),
+)
+
+# Database
+db_query_seconds = Histogram("db_query_duration_seconds", "Duration of SQL statements.")
+
+
+@contextmanager
+def track_turn(mode: str) -> Iterator[None]:
+    """Record duration, in-flight count and errors of a chat turn."""
+    start = time.perf_counter()
+    chat_turns_in_flight.inc(mode=mode)
+    try:
+        yield
+    except Exception:
+        chat_turn_errors.inc(mode=mode)
+        raise
+    finally:
+        chat_turns_in_flight.dec(mode=mode)
+        chat_turn_seconds.observe(time.perf_counter() - start, mode=mode)
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Record duration and errors of a chat pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        chat_stage_errors.inc(stage=stage)
+        raise
+    finally:
+        chat_stage_seconds.observe(time.perf_counter() - start, stage=stage)
+
+
+def instrument_provider(provider: str, operation: str):
+    """
+    Decorate a provider method to record its latency, errors and concurrency.
+
+    Works on coroutine functions and on async generator functions, where the
+    duration spans the whole stream.
+    """
+    labels = {"provider": provider, "operation": operation}
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def stream_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                provider_requests_in_flight.inc(**labels)
+                try:
+                    # Closing the wrapper early must close the provider stream too
+                    async with aclosing(func(*args, **kwargs)) as stream:
+                        async for item in stream:
+                            yield item
+                except Exception:
+                    provider_errors.inc(**labels)
+                    raise
+                finally:
+                    provider_requests_in_flight.dec(**labels)
+                    provider_request_seconds.observe(time.perf_counter() - start, **labels)
+
+            return stream_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            provider_requests_in_flight.inc(**labels)
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                provider_errors.inc(**labels)
+                raise
+            finally:
+                provider_requests_in_flight.dec(**labels)
+                provider_request_seconds.observe(time.perf_counter() - start, **labels)
+
+        return wrapper
+
+    return decorator
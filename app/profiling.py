@@ -0,0 +1,193 @@
+"""
+On-demand sampling profiler for individual requests.
+
+A profiled request starts a background thread that samples the event loop
+thread's Python stack at a fixed interval until the response has been sent,
+then writes the samples in the folded-stack format read by flamegraph.pl,
+speedscope and inferno. The request is tagged with a context variable, which
+the tasks it creates inherit; only samples taken while the task serving the
+request or one of those tasks was running are kept, so concurrent requests
+and the loop idling in its selector are left out. Each stack is rooted at the
+name of the task it was sampled in.
+
+The middleware is only installed when profiling is configured, so it costs
+nothing otherwise.
+"""
+
+import asyncio
+import hmac
+import logging
+import random
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Set while a profiled request is served and inherited by the tasks it creates
+_profile_id: ContextVar[str | None] = ContextVar("profile_id", default=None)
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks one request's tasks run on a loop thread until stopped."""
+
+    def __init__(
+        self,
+        thread_id: int,
+        loop: asyncio.AbstractEventLoop,
+        interval: float,
+        profile_id: str,
+    ):
+        super().__init__(name="profiler", daemon=True)
+        self.thread_id = thread_id
+        self.loop = loop
+        self.interval = interval
+        self.profile_id = profile_id
+        self.samples: Counter[str] = Counter()
+        # The task serving the request and every task created on its behalf
+        self.tasks: weakref.WeakSet[asyncio.Task] = weakref.WeakSet()
+        self._previous_task_factory = None
+        self._stop_event = threading.Event()
+
+    def _task_factory(self, loop, coro, context=None):
+        # Called in the creating task's context unless an explicit one is given
+        if self._previous_task_factory is not None:
+            if context is None:
+                task = self._previous_task_factory(loop, coro)
+            else:
+                task = self._previous_task_factory(loop, coro, context=context)
+        else:
+            task = asyncio.Task(coro, loop=loop, context=context)
+        owner = context.get(_profile_id) if context is not None else _profile_id.get()
+        if owner == self.profile_id:
+            self.tasks.add(task)
+        return task
+
+    def start(self) -> None:
+        """Start sampling; must be called on the loop thread."""
+        self._previous_task_factory = self.loop.get_task_factory()
+        self.loop.set_task_factory(self._task_factory)
+        super().start()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            task = asyncio.current_task(self.loop)
+            if task is None or task not in self.tasks:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                name = f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+                stack.append(name.replace(";", ":"))
+                frame = frame.f_back
+            stack.append(f"task {task.get_name()}")
+            self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        """Stop sampling; must be called on the loop thread."""
+        self._stop_event.set()
+        self.join()
+        self.loop.set_task_factory(self._previous_task_factory)
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests on the given path prefixes.
+
+    A request is profiled when it carries the admin token in the
+    ``X-Profile-Token`` header, or otherwise with probability
+    ``sample_rate``. Only one request is profiled at a time. The profile id
+    is returned in the ``X-Profile-Id`` response header and names the file
+    written to ``output_dir``, where only the newest ``max_files`` profiles
+    are kept.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: tuple[str, ...],
+        sample_rate: float,
+        admin_token: str,
+        output_dir: str,
+        interval_seconds: float,
+        max_files: int,
+    ):
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token.encode()
+        self.output_dir = Path(output_dir)
+        self.interval_seconds = interval_seconds
+        self.max_files = max_files
+        self._active = False
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.admin_token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_TOKEN_HEADER:
+                    return hmac.compare_digest(value, self.admin_token)
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self._active
+            or not scope["path"].startswith(self.path_prefixes)
+            or not self._should_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:8]}"
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self._active = True
+        sampler = StackSampler(
+            threading.get_ident(), asyncio.get_running_loop(), self.interval_seconds, profile_id
+        )
+        sampler.tasks.add(asyncio.current_task())
+        token = _profile_id.set(profile_id)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            _profile_id.reset(token)
+            self._active = False
+            slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")
+            path = self.output_dir / f"{profile_id}-{scope['method']}-{slug}.folded"
+            try:
+                await asyncio.to_thread(self._write, path, sampler.folded())
+                logger.info("Wrote request profile %s", path)
+            except OSError:
+                logger.warning("Writing request profile %s failed", path, exc_info=True)
+
+    def _write(self, path: Path, folded: str) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(folded)
+        # Names start with the profile's timestamp, so they sort oldest first
+        profiles = sorted(self.output_dir.glob("*.folded"))
+        for old in profiles[: max(len(profiles) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
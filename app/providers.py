@@ -0,0 +1,118 @@
+"""
+Long-lived provider registry.
+
+LLM and speech providers wrap HTTP clients with their own connection pools, so
+they are created once during application startup and shared by every request
+instead of being rebuilt (and re-handshaking) on each chat turn.
+
+With ``provider_mode`` set to ``record`` or ``replay`` every provider is
+wrapped by its cassette counterpart (see app.replay); in ``replay`` mode the
+real providers are never created.
+"""
+
+from app.config import settings
+from app.emotion.hume import HumeEmotionDetector, hume_detector
+from app.llm import BaseLLM, get_llm
+from app.replay import (
+    MODE_LIVE,
+    MODE_REPLAY,
+    CassetteEmotionDetector,
+    CassetteLLM,
+    CassetteStore,
+    CassetteSTT,
+    CassetteTTS,
+)
+from app.speech import BaseSTT, BaseTTS, get_stt, get_tts
+from app.speech.cache import CachedSTT, CachedTTS, SpeechCache
+
+
+def _speech_cache(namespace: str, on_disk: bool) -> SpeechCache:
+    return SpeechCache(
+        namespace,
+        settings.speech_cache_max_memory_bytes,
+        settings.speech_cache_dir if on_disk else "",
+        settings.speech_cache_max_disk_bytes,
+        settings.speech_cache_disk_ttl_seconds,
+    )
+
+
+class ProviderRegistry:
+    """Holds the process-wide LLM, STT, TTS and emotion provider instances."""
+
+    def __init__(self):
+        self._llm: BaseLLM | None = None
+        self._stt: BaseSTT | None = None
+        self._tts: BaseTTS | None = None
+        self._emotion: HumeEmotionDetector | CassetteEmotionDetector | None = None
+        self._cassettes: CassetteStore | None = None
+
+    def _create(self, factory, cassette_class):
+        """Build a provider, wrapped for recording or replaced for replay as configured."""
+        if settings.provider_mode == MODE_LIVE:
+            return factory()
+        if self._cassettes is None:
+            self._cassettes = CassetteStore(settings.cassette_dir)
+        live = None if settings.provider_mode == MODE_REPLAY else factory()
+        return cassette_class(
+            live, self._cassettes, settings.provider_mode, settings.replay_latency_scale
+        )
+
+    @property
+    def llm(self) -> BaseLLM:
+        if self._llm is None:
+            self._llm = self._create(get_llm, CassetteLLM)
+        return self._llm
+
+    @property
+    def stt(self) -> BaseSTT:
+        if self._stt is None:
+            self._stt = self._create(get_stt, CassetteSTT)
+            if settings.speech_cache_enabled:
+                # Transcripts of what users said stay in memory only
+                self._stt = CachedSTT(self._stt, _speech_cache("stt", on_disk=False))
+        return self._stt
+
+    @property
+    def tts(self) -> BaseTTS:
+        if self._tts is None:
+            self._tts = self._create(get_tts, CassetteTTS)
+            if settings.speech_cache_enabled:
+                self._tts = CachedTTS(self._tts, _speech_cache("tts", on_disk=True))
+        return self._tts
+
+    @property
+    def emotion(self) -> HumeEmotionDetector | CassetteEmotionDetector:
+        if self._emotion is None:
+            self._emotion = self._create(lambda: hume_detector, CassetteEmotionDetector)
+        return self._emotion
+
+    def override(
+        self,
+        llm: BaseLLM | None = None,
+        stt: BaseSTT | None = None,
+        tts: BaseTTS | None = None,
+    ) -> None:
+        """Replace providers, e.g. with fakes for benchmarks or local development."""
+        if llm is not None:
+            self._llm = llm
+        if stt is not None:
+            self._stt = stt
+        if tts is not None:
+            self._tts = tts
+
+    async def startup(self) -> None:
+        """Create every configured provider so the first request doesn't pay for it."""
+        self.llm
+        self.stt
+        self.tts
+        self.emotion
+
+    async def shutdown(self) -> None:
+        """Close provider connection pools."""
+        for provider in (self._llm, self._stt, self._tts):
+            if provider is not None:
+                await provider.aclose()
+        self._llm = self._stt = self._tts = self._emotion = None
+
+
+providers = ProviderRegistry()
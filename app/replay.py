@@ -0,0 +1,213 @@
+"""
+Record-and-replay provider wrappers for offline load testing.
+
+In ``record`` mode each wrapper forwards calls to the real provider and
+writes the response, with its latency (and for streams the timing of every
+chunk), to a cassette directory. In ``replay`` mode no real provider is
+created: responses come from the cassettes after sleeping for the recorded
+latency times ``replay_latency_scale``.
+
+Requests are matched by a hash of their inputs. Load tests rarely repeat a
+request exactly (chat history grows every turn), so a replay miss falls back
+to cycling through the recordings of that operation; the latency profile is
+what matters for capacity testing, not the exact words.
+"""
+
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import time
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import BinaryIO
+
+from app.emotion.hume import HumeEmotionDetector
+from app.emotion.schemas import EmotionResult
+from app.llm.base import BaseLLM, LLMMessage
+from app.speech.cache import hash_audio
+from app.speech.stt.base import BaseSTT
+from app.speech.tts.base import BaseTTS
+
+MODE_LIVE = "live"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class CassetteStore:
+    """Recorded provider responses, one JSON file per request under ``operation/``."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._entries: dict[str, dict[str, dict]] = {}
+        self._cycles: dict[str, itertools.cycle] = {}
+
+    def entries(self, operation: str) -> dict[str, dict]:
+        """Recordings of an operation by key, read from disk on first use."""
+        entries = self._entries.get(operation)
+        if entries is None:
+            entries = {}
+            for path in sorted((self.directory / operation).glob("*.json")):
+                entries[path.stem] = json.loads(path.read_text())
+            self._entries[operation] = entries
+        return entries
+
+    def lookup(self, operation: str, key: str) -> dict:
+        """Return the recording for key, or the next recording of the operation."""
+        entries = self.entries(operation)
+        if key in entries:
+            return entries[key]
+        if not entries:
+            raise LookupError(f"No {operation} recordings in {self.directory}")
+        if operation not in self._cycles:
+            self._cycles[operation] = itertools.cycle(list(entries.values()))
+        return next(self._cycles[operation])
+
+    async def record(self, operation: str, key: str, entry: dict) -> None:
+        self.entries(operation)[key] = entry
+        await asyncio.to_thread(self._write, operation, key, entry)
+
+    def _write(self, operation: str, key: str, entry: dict) -> None:
+        directory = self.directory / operation
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f"{key}.tmp"
+        tmp.write_text(json.dumps(entry))
+        tmp.replace(directory / f"{key}.json")
+
+
+class _Cassette:
+    """Shared record/replay plumbing for the provider wrappers."""
+
+    def __init__(self, store: CassetteStore, mode: str, latency_scale: float):
+        self.store = store
+        self.mode = mode
+        self.latency_scale = latency_scale
+
+    async def _call(self, operation: str, key: str, call, encode, decode):
+        """Replay a recording, or make the real call and record it."""
+        if self.mode == MODE_REPLAY:
+            entry = self.store.lookup(operation, key)
+            await asyncio.sleep(entry["latency"] * self.latency_scale)
+            return decode(entry["response"])
+
+        start = time.perf_counter()
+        response = await call()
+        latency = time.perf_counter() - start
+        await self.store.record(operation, key, {"latency": latency, "response": encode(response)})
+        return response
+
+
+class CassetteLLM(_Cassette, BaseLLM):
+    def __init__(self, llm: BaseLLM | None, store: CassetteStore, mode: str, scale: float):
+        super().__init__(store, mode, scale)
+        self.llm = llm
+
+    @staticmethod
+    def _key(messages: list[LLMMessage], system_prompt: str | None) -> str:
+        return _hash(system_prompt or "", *(f"{m.role}:{m.content}" for m in messages))
+
+    async def chat(self, messages: list[LLMMessage], system_prompt: str | None = None) -> str:
+        return await self._call(
+            "llm_chat",
+            self._key(messages, system_prompt),
+            lambda: self.llm.chat(messages, system_prompt=system_prompt),
+            encode=lambda text: text,
+            decode=lambda text: text,
+        )
+
+    async def chat_stream(
+        self, messages: list[LLMMessage], system_prompt: str | None = None
+    ) -> AsyncGenerator[str, None]:
+        key = self._key(messages, system_prompt)
+        if self.mode == MODE_REPLAY:
+            # Each chunk carries its delay since the previous one
+            for delay, chunk in self.store.lookup("llm_chat_stream", key)["chunks"]:
+                await asyncio.sleep(delay * self.latency_scale)
+                yield chunk
+            return
+
+        chunks = []
+        last = time.perf_counter()
+        async for chunk in self.llm.chat_stream(messages, system_prompt=system_prompt):
+            now = time.perf_counter()
+            chunks.append((now - last, chunk))
+            last = now
+            yield chunk
+        await self.store.record("llm_chat_stream", key, {"chunks": chunks})
+
+    async def aclose(self) -> None:
+        if self.llm is not None:
+            await self.llm.aclose()
+
+
+class CassetteSTT(_Cassette, BaseSTT):
+    def __init__(self, stt: BaseSTT | None, store: CassetteStore, mode: str, scale: float):
+        super().__init__(store, mode, scale)
+        self.stt = stt
+        self.model = getattr(stt, "model", "cassette")
+
+    async def transcribe(self, audio_data: bytes | BinaryIO, language: str = "en") -> str:
+        audio_hash = await asyncio.to_thread(hash_audio, audio_data)
+        return await self._call(
+            "stt_transcribe",
+            _hash(audio_hash, language),
+            lambda: self.stt.transcribe(audio_data, language=language),
+            encode=lambda text: text,
+            decode=lambda text: text,
+        )
+
+    async def aclose(self) -> None:
+        if self.stt is not None:
+            await self.stt.aclose()
+
+
+class CassetteTTS(_Cassette, BaseTTS):
+    def __init__(self, tts: BaseTTS | None, store: CassetteStore, mode: str, scale: float):
+        super().__init__(store, mode, scale)
+        self.tts = tts
+        self.model = getattr(tts, "model", "cassette")
+        if tts is not None:
+            self.media_type = tts.media_type
+        else:
+            recordings = store.entries("tts_synthesize").values()
+            if recordings:
+                self.media_type = next(iter(recordings))["response"]["media_type"]
+
+    async def synthesize(self, text: str, lang: str = "en-IN", voice: str = "shubh") -> bytes:
+        return await self._call(
+            "tts_synthesize",
+            _hash(text, lang, voice),
+            lambda: self.tts.synthesize(text, lang=lang, voice=voice),
+            encode=lambda audio: {
+                "media_type": self.media_type,
+                "audio": base64.b64encode(audio).decode(),
+            },
+            decode=lambda response: base64.b64decode(response["audio"]),
+        )
+
+    async def aclose(self) -> None:
+        if self.tts is not None:
+            await self.tts.aclose()
+
+
+class CassetteEmotionDetector(_Cassette):
+    def __init__(
+        self, detector: HumeEmotionDetector | None, store: CassetteStore, mode: str, scale: float
+    ):
+        super().__init__(store, mode, scale)
+        self.detector = detector
+
+    async def detect_from_audio(self, audio_data: bytes | BinaryIO) -> EmotionResult | None:
+        audio_hash = await asyncio.to_thread(hash_audio, audio_data)
+        return await self._call(
+            "emotion_detect",
+            audio_hash,
+            lambda: self.detector.detect_from_audio(audio_data),
+            encode=lambda result: result.model_dump() if result is not None else None,
+            decode=lambda data: EmotionResult.model_validate(data) if data is not None else None,
+        )
@@ -1,4 +1,4 @@
-from app.speech.stt import get_stt
-from app.speech.tts import get_tts
+from app.speech.stt import BaseSTT, get_stt
+from app.speech.tts import BaseTTS, get_tts
 
-__all__ = ["get_stt", "get_tts"]
+__all__ = ["BaseSTT", "BaseTTS", "get_stt", "get_tts"]
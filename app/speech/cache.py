@@ -0,0 +1,204 @@
+"""
+Content-addressed cache for speech provider results.
+
+Synthesized audio is keyed by a hash of (text, lang, voice, model, media type)
+and transcripts by a hash of the audio bytes, so repeated phrases and retried
+uploads skip the provider entirely. Entries live in a byte-bounded in-memory
+LRU. Synthesized audio can also be kept in an on-disk store that survives
+restarts; it is bounded in size and age, with file mtimes tracking last use.
+Transcripts of user audio are only ever held in memory.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+from app.speech.stt.base import BaseSTT
+from app.speech.tts.base import BaseTTS
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+# The disk tier is also pruned this often, so expired entries go even when it is not full
+_PRUNE_INTERVAL_SECONDS = 3600.0
+# Pruning for size frees space down to this fraction of the limit
+_PRUNE_LOW_WATER = 0.9
+
+
+class SpeechCache:
+    """Byte-bounded LRU of cached values with an optional bounded disk tier."""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_memory_bytes: int,
+        directory: str = "",
+        max_disk_bytes: int = 0,
+        disk_ttl_seconds: float = 0.0,
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.directory = Path(directory) / namespace if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        # Estimated bytes on disk, measured by the first prune
+        self._disk_size: int | None = None
+        self._last_prune = 0.0
+        self._disk_lock = threading.Lock()
+
+    async def get(self, key: str) -> bytes | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            return value
+        if self.directory is None:
+            return None
+        value = await asyncio.to_thread(self._read, key)
+        if value is None:
+            return None
+        self._remember(key, value)
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._remember(key, value)
+        if self.directory is None:
+            return
+        try:
+            await asyncio.to_thread(self._write, key, value)
+        except OSError:
+            logger.warning("Writing speech cache entry %s failed", key, exc_info=True)
+
+    def _remember(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_memory_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = value
+        self._size += len(value)
+        while self._size > self.max_memory_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return self.disk_ttl_seconds > 0 and now - mtime > self.disk_ttl_seconds
+
+    def _read(self, key: str) -> bytes | None:
+        path = self.directory / key
+        try:
+            if self._expired(path.stat().st_mtime, time.time()):
+                path.unlink(missing_ok=True)
+                return None
+            value = path.read_bytes()
+            # Bump the mtime so pruning evicts least recently used entries first
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return value
+
+    def _write(self, key: str, value: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp = self.directory / f"{key}.tmp"
+        tmp.write_bytes(value)
+        tmp.replace(self.directory / key)
+        with self._disk_lock:
+            if self._disk_size is not None:
+                self._disk_size += len(value)
+            if (
+                self._disk_size is None
+                or self._disk_size > self.max_disk_bytes
+                or time.monotonic() - self._last_prune > _PRUNE_INTERVAL_SECONDS
+            ):
+                self._prune()
+
+    def _prune(self) -> None:
+        """Delete expired entries, then the least recently used until under the size limit."""
+        now = time.time()
+        entries = []
+        for path in self.directory.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            # Leave files that a concurrent write is about to rename into place
+            if path.suffix == ".tmp" and now - stat.st_mtime < 60:
+                continue
+            if self._expired(stat.st_mtime, now):
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_disk_bytes:
+            target = self.max_disk_bytes * _PRUNE_LOW_WATER
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+        self._disk_size = total
+        self._last_prune = time.monotonic()
+
+
+def hash_audio(audio_data: bytes | BinaryIO) -> str:
+    """SHA-256 of audio bytes or a file object, which is rewound afterwards."""
+    digest = hashlib.sha256()
+    if isinstance(audio_data, bytes):
+        digest.update(audio_data)
+    else:
+        while chunk := audio_data.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        audio_data.seek(0)
+    return digest.hexdigest()
+
+
+class CachedTTS(BaseTTS):
+    """TTS provider wrapper that serves repeated syntheses from a SpeechCache."""
+
+    def __init__(self, tts: BaseTTS, cache: SpeechCache):
+        self.tts = tts
+        self.cache = cache
+        self.media_type = tts.media_type
+
+    async def synthesize(self, text: str, lang: str = "en-IN", voice: str = "shubh") -> bytes:
+        model = getattr(self.tts, "model", type(self.tts).__name__)
+        key = hashlib.sha256(
+            "\0".join([text, lang, voice, model, self.media_type]).encode()
+        ).hexdigest()
+        audio = await self.cache.get(key)
+        if audio is None:
+            audio = await self.tts.synthesize(text, lang=lang, voice=voice)
+            await self.cache.set(key, audio)
+        return audio
+
+    async def aclose(self) -> None:
+        await self.tts.aclose()
+
+
+class CachedSTT(BaseSTT):
+    """STT provider wrapper that serves repeated transcriptions from a SpeechCache."""
+
+    def __init__(self, stt: BaseSTT, cache: SpeechCache):
+        self.stt = stt
+        self.cache = cache
+
+    async def transcribe(self, audio_data: bytes | BinaryIO, language: str = "en") -> str:
+        model = getattr(self.stt, "model", type(self.stt).__name__)
+        audio_hash = await asyncio.to_thread(hash_audio, audio_data)
+        key = hashlib.sha256("\0".join([audio_hash, language, model]).encode()).hexdigest()
+        transcript = await self.cache.get(key)
+        if transcript is not None:
+            return transcript.decode()
+        text = await self.stt.transcribe(audio_data, language=language)
+        await self.cache.set(key, text.encode())
+        return text
+
+    async def aclose(self) -> None:
+        await self.stt.aclose()
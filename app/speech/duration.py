@@ -0,0 +1,293 @@
+"""
+Audio duration from container metadata, without decoding.
+
+Voice uploads are bounded in length before they are sent to STT. Each
+supported container is recognized by its magic bytes and its duration read
+from headers, page granules or block timecodes:
+
+- WAV: data chunk size over the byte rate
+- Ogg (Opus or Vorbis): granule position of the last page
+- WebM/Matroska: the segment Duration, or else the latest block timecode
+- MP3: sum of MPEG audio frames
+- FLAC: total samples in STREAMINFO
+- MP4/M4A: the movie header duration
+
+Files are read through seeks and small reads, so a spooled upload is never
+loaded whole into memory. The parsers are synchronous and callers should run
+them off the event loop; formats that are walked element by element give up
+after a fixed number of elements, so a crafted file cannot keep a worker busy.
+"""
+
+import struct
+from collections.abc import Callable
+from typing import BinaryIO
+
+SUPPORTED_FORMATS = ("WAV", "MP3", "Ogg", "WebM", "FLAC", "MP4")
+
+# How far from the end of an Ogg stream to look for its last page
+_OGG_TAIL_BYTES = 64 * 1024
+# WAV chunks, Matroska elements, MP3 frames or MP4 atoms scanned before
+# giving up; a two-minute clip needs a few thousand at most
+_MAX_SCANNED = 50_000
+
+# Matroska element ids
+_EBML_SEGMENT = 0x18538067
+_EBML_INFO = 0x1549A966
+_EBML_TIMECODE_SCALE = 0x2AD7B1
+_EBML_DURATION = 0x4489
+_EBML_CLUSTER = 0x1F43B675
+_EBML_CLUSTER_TIMECODE = 0xE7
+_EBML_BLOCK_GROUP = 0xA0
+_EBML_BLOCK = 0xA1
+_EBML_SIMPLE_BLOCK = 0xA3
+# Elements whose children are scanned rather than skipped
+_EBML_MASTERS = {_EBML_SEGMENT, _EBML_INFO, _EBML_CLUSTER, _EBML_BLOCK_GROUP}
+
+# MPEG audio layer III bitrates (kbit/s) by index, for MPEG-1 and MPEG-2/2.5
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1) and index
+_MP3_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+
+
+def _wav_duration(audio: BinaryIO) -> float | None:
+    end = audio.seek(0, 2)
+    audio.seek(12)
+    byte_rate = None
+    for _ in range(_MAX_SCANNED):
+        if len(header := audio.read(8)) != 8:
+            break
+        chunk_id, size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            fmt = audio.read(size)
+            if len(fmt) < 12:
+                return None
+            byte_rate = struct.unpack_from("<I", fmt, 8)[0]
+            # Chunks are word aligned
+            audio.seek(size % 2, 1)
+        elif chunk_id == b"data":
+            # Recorders that stream WAV may leave a placeholder size
+            size = min(size, end - audio.tell())
+            return size / byte_rate if byte_rate else None
+        else:
+            audio.seek(size + size % 2, 1)
+    return None
+
+
+def _ogg_duration(audio: BinaryIO) -> float | None:
+    first_page = audio.read(27 + 255)
+    if len(first_page) < 28:
+        return None
+    segments = first_page[26]
+    packet = first_page[27 + segments :]
+    if packet.startswith(b"OpusHead") and len(packet) >= 12:
+        sample_rate = 48000
+        pre_skip = struct.unpack_from("<H", packet, 10)[0]
+    elif packet.startswith(b"\x01vorbis") and len(packet) >= 16:
+        sample_rate = struct.unpack_from("<I", packet, 12)[0]
+        pre_skip = 0
+    else:
+        return None
+
+    end = audio.seek(0, 2)
+    audio.seek(max(0, end - _OGG_TAIL_BYTES))
+    tail = audio.read()
+    position = len(tail)
+    while (position := tail.rfind(b"OggS", 0, position)) != -1:
+        if position + 14 <= len(tail):
+            granule = struct.unpack_from("<q", tail, position + 6)[0]
+            # -1 marks pages on which no packet ends
+            if granule >= 0 and sample_rate:
+                return max(granule - pre_skip, 0) / sample_rate
+    return None
+
+
+def _read_vint(audio: BinaryIO, keep_marker: bool) -> tuple[int | None, int] | None:
+    """Read an EBML variable-length integer; None for an unknown size."""
+    first = audio.read(1)
+    if not first:
+        return None
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first[0] & mask:
+        length += 1
+        mask >>= 1
+    if length > 8:
+        return None
+    rest = audio.read(length - 1)
+    if len(rest) != length - 1:
+        return None
+    value = int.from_bytes(first + rest, "big")
+    if keep_marker:
+        return value, length
+    value &= (1 << (7 * length)) - 1
+    if value == (1 << (7 * length)) - 1:
+        return None, length
+    return value, length
+
+
+def _webm_duration(audio: BinaryIO) -> float | None:
+    end = audio.seek(0, 2)
+    audio.seek(0)
+    timecode_scale = 1_000_000
+    cluster_timecode = 0
+    latest = None
+    for _ in range(_MAX_SCANNED):
+        if audio.tell() >= end:
+            break
+        element_id = _read_vint(audio, keep_marker=True)
+        size = _read_vint(audio, keep_marker=False)
+        if element_id is None or size is None:
+            break
+        element_id, size = element_id[0], size[0]
+        if element_id in _EBML_MASTERS:
+            continue
+        if size is None or audio.tell() + size > end:
+            break
+        payload_start = audio.tell()
+        if element_id == _EBML_TIMECODE_SCALE:
+            timecode_scale = int.from_bytes(audio.read(size), "big")
+        elif element_id == _EBML_DURATION and size in (4, 8):
+            (duration,) = struct.unpack(">f" if size == 4 else ">d", audio.read(size))
+            return duration * timecode_scale / 1e9
+        elif element_id == _EBML_CLUSTER_TIMECODE:
+            cluster_timecode = int.from_bytes(audio.read(size), "big")
+        elif element_id in (_EBML_SIMPLE_BLOCK, _EBML_BLOCK):
+            if _read_vint(audio, keep_marker=False) is None:
+                break
+            (relative,) = struct.unpack(">h", audio.read(2))
+            timecode = cluster_timecode + relative
+            latest = timecode if latest is None else max(latest, timecode)
+        audio.seek(payload_start + size)
+    else:
+        # Scan budget exhausted
+        return None
+    if latest is None:
+        return None
+    return latest * timecode_scale / 1e9
+
+
+def _mp3_duration(audio: BinaryIO) -> float | None:
+    header = audio.read(10)
+    start = 0
+    if header.startswith(b"ID3") and len(header) == 10:
+        # Syncsafe size, plus a 10 byte footer when flagged
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        start = 10 + size + (10 if header[5] & 0x10 else 0)
+    audio.seek(start)
+
+    seconds = 0.0
+    frames = 0
+    while len(header := audio.read(4)) == 4:
+        if frames == _MAX_SCANNED:
+            return None
+        word = int.from_bytes(header, "big")
+        version = (word >> 19) & 0b11
+        layer = (word >> 17) & 0b11
+        bitrate_index = (word >> 12) & 0b1111
+        rate_index = (word >> 10) & 0b11
+        if (
+            word >> 21 != 0x7FF
+            or version == 1
+            or layer != 0b01
+            or bitrate_index in (0, 15)
+            or rate_index == 3
+        ):
+            # Trailing tags or junk end the stream
+            break
+        mpeg1 = version == 3
+        bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        padding = (word >> 9) & 1
+        samples = 1152 if mpeg1 else 576
+        frame_length = samples // 8 * bitrate // sample_rate + padding
+        seconds += samples / sample_rate
+        frames += 1
+        audio.seek(frame_length - 4, 1)
+    return seconds if frames else None
+
+
+def _flac_duration(audio: BinaryIO) -> float | None:
+    audio.seek(4)
+    block = audio.read(4 + 34)
+    # STREAMINFO is always the first metadata block
+    if len(block) < 38 or block[0] & 0x7F != 0:
+        return None
+    packed = int.from_bytes(block[4 + 10 : 4 + 18], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+
+def _mp4_duration(audio: BinaryIO) -> float | None:
+    end = audio.seek(0, 2)
+    audio.seek(0)
+    for _ in range(_MAX_SCANNED):
+        if audio.tell() + 8 > end:
+            break
+        atom_start = audio.tell()
+        size, atom_type = struct.unpack(">I4s", audio.read(8))
+        if size == 1:
+            size = struct.unpack(">Q", audio.read(8))[0]
+        elif size == 0:
+            size = end - atom_start
+        if size < 8:
+            return None
+        if atom_type == b"moov":
+            # Descend: the next atom read is moov's first child
+            continue
+        if atom_type == b"mvhd":
+            version = audio.read(4)[0]
+            if version == 1:
+                audio.seek(16, 1)
+                timescale, duration = struct.unpack(">IQ", audio.read(12))
+            else:
+                audio.seek(8, 1)
+                timescale, duration = struct.unpack(">II", audio.read(8))
+            return duration / timescale if timescale else None
+        audio.seek(atom_start + size)
+    return None
+
+
+def _detect(magic: bytes) -> Callable[[BinaryIO], float | None] | None:
+    if magic[:4] == b"RIFF" and magic[8:12] == b"WAVE":
+        return _wav_duration
+    if magic[:4] == b"OggS":
+        return _ogg_duration
+    if magic[:4] == b"\x1a\x45\xdf\xa3":
+        return _webm_duration
+    if magic[:4] == b"fLaC":
+        return _flac_duration
+    if magic[4:8] == b"ftyp":
+        return _mp4_duration
+    if magic[:3] == b"ID3" or (len(magic) >= 2 and magic[0] == 0xFF and magic[1] & 0xE0 == 0xE0):
+        return _mp3_duration
+    return None
+
+
+def audio_duration(audio: BinaryIO) -> float | None:
+    """
+    Duration in seconds of an audio file object, which is rewound afterwards.
+
+    Returns None when the format is not recognized or its duration cannot be
+    read.
+    """
+    try:
+        audio.seek(0)
+        measure = _detect(audio.read(12))
+        if measure is None:
+            return None
+        audio.seek(0)
+        return measure(audio)
+    except (struct.error, IndexError, OverflowError):
+        return None
+    finally:
+        audio.seek(0)
@@ -0,0 +1,44 @@
+"""
+Incremental sentence splitting for streamed LLM output.
+
+Lets the voice pipeline hand each finished sentence to TTS while the LLM is
+still generating the rest of the reply.
+"""
+
+import re
+
+# Sentence-ending punctuation (including the Devanagari danda) followed by
+# whitespace, or a line break
+_BOUNDARY = re.compile(r"(?<=[.!?।])\s+|\n+")
+
+
+class SentenceSplitter:
+    """
+    Buffers streamed text and releases it one sentence at a time.
+
+    Sentences shorter than ``min_chars`` are merged with the next one so TTS
+    isn't called for fragments like "Oh." on their own.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add a chunk of text and return any sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            candidate = self._buffer[start : match.start()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str | None:
+        """Return whatever text remains once the stream has ended."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
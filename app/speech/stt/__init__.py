@@ -10,5 +10,9 @@ def get_stt(provider: str | None = None) -> BaseSTT:
         from app.speech.stt.openai import OpenAISTT
 
         return OpenAISTT()
+    elif provider == "sarvam":
+        from app.speech.stt.sarvam import SarvamSTT
+
+        return SarvamSTT()
     else:
         raise ValueError(f"Unknown STT provider: {provider}")
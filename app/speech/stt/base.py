@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
+from typing import BinaryIO
 
 
 class BaseSTT(ABC):
     """Abstract base class for Speech-to-Text providers."""
 
     @abstractmethod
-    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
-        """Transcribe audio to text."""
+    async def transcribe(self, audio_data: bytes | BinaryIO, language: str = "en") -> str:
+        """Transcribe audio (raw bytes or a file object positioned at the start) to text."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release any network resources held by the provider."""
         pass
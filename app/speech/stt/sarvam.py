@@ -1,19 +1,37 @@
-import io
+import asyncio
+from typing import BinaryIO
 
-from sarvamai import SarvamAI
+import httpx
+from sarvamai import AsyncSarvamAI
 
 from app.config import settings
+from app.metrics import instrument_provider
 from app.speech.stt.base import BaseSTT
 
 
 class SarvamSTT(BaseSTT):
     def __init__(self, model: str = "saaras:v3"):
-        self.client = SarvamAI(api_subscription_key=settings.sarvam_api_key)
+        max_concurrency = settings.sarvam_stt_max_concurrency
+        self.http_client = httpx.AsyncClient(
+            timeout=settings.sarvam_timeout_seconds,
+            limits=httpx.Limits(max_connections=max_concurrency),
+        )
+        self.client = AsyncSarvamAI(
+            api_subscription_key=settings.sarvam_api_key, httpx_client=self.http_client
+        )
         self.model = model
+        # Bounds in-flight transcriptions so a burst of voice turns queues here
+        # instead of exhausting the connection pool
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
-    async def transcribe(self, audio_data: bytes, language: str = "en") -> str:
-        audio_file = io.BytesIO(audio_data)
-        audio_file.name = "audio.webm"
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
 
-        response = self.client.speech_to_text.transcribe(model=self.model, file=audio_file)
+    @instrument_provider("sarvam", "transcribe")
+    async def transcribe(self, audio_data: bytes | BinaryIO, language: str = "en") -> str:
+        # Passed through to the multipart body as-is, without an intermediate copy
+        async with self._semaphore:
+            response = await self.client.speech_to_text.transcribe(
+                model=self.model, file=("audio.webm", audio_data)
+            )
         return response.transcript
@@ -10,5 +10,9 @@ def get_tts(provider: str | None = None) -> BaseTTS:
         from app.speech.tts.openai import OpenAITTS
 
         return OpenAITTS()
+    elif provider == "sarvam":
+        from app.speech.tts.sarvam import SarvamTTS
+
+        return SarvamTTS()
     else:
         raise ValueError(f"Unknown TTS provider: {provider}")
@@ -4,7 +4,14 @@ from abc import ABC, abstractmethod
 class BaseTTS(ABC):
     """Abstract base class for Text-to-Speech providers."""
 
+    # MIME type of the audio returned by synthesize()
+    media_type: str = "audio/wav"
+
     @abstractmethod
     async def synthesize(self, text: str, lang: str = "en-IN", voice: str = "shubh") -> bytes:
         """Convert text to speech audio."""
         pass
+
+    async def aclose(self) -> None:
+        """Release any network resources held by the provider."""
+        pass
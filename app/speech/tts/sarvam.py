@@ -1,19 +1,47 @@
+import asyncio
 import base64
 
-from sarvamai import SarvamAI
+import httpx
+from sarvamai import AsyncSarvamAI
 
 from app.config import settings
+from app.metrics import instrument_provider
 from app.speech.tts.base import BaseTTS
 
+MEDIA_TYPES = {
+    "mp3": "audio/mpeg",
+    "aac": "audio/aac",
+}
+
 
 class SarvamTTS(BaseTTS):
     def __init__(self, model: str = "bulbul:v3"):
-        self.client = SarvamAI(api_subscription_key=settings.sarvam_api_key)
+        max_concurrency = settings.sarvam_tts_max_concurrency
+        self.http_client = httpx.AsyncClient(
+            timeout=settings.sarvam_timeout_seconds,
+            limits=httpx.Limits(max_connections=max_concurrency),
+        )
+        self.client = AsyncSarvamAI(
+            api_subscription_key=settings.sarvam_api_key, httpx_client=self.http_client
+        )
         self.model = model
+        self.codec = settings.sarvam_tts_codec
+        self.media_type = MEDIA_TYPES[self.codec]
+        # Bounds in-flight syntheses so a burst of voice turns queues here
+        # instead of exhausting the connection pool
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+    @instrument_provider("sarvam", "synthesize")
     async def synthesize(self, text: str, lang: str = "en-IN", voice: str = "shubh") -> bytes:
-        response = self.client.text_to_speech.convert(
-            model=self.model, speaker=voice, text=text, target_language_code=lang
-        )
-        response.audios[0]
+        async with self._semaphore:
+            response = await self.client.text_to_speech.convert(
+                model=self.model,
+                speaker=voice,
+                text=text,
+                language_code=lang,
+                output_audio_codec=self.codec,
+            )
         return base64.b64decode(response.audios[0])
@@ -0,0 +1,51 @@
+"""
+In-process cache of users resolved from access tokens.
+
+Saves the ``SELECT users`` that get_current_user would otherwise run on every
+authenticated request. Entries expire after a TTL and the cache is bounded
+LRU. Invalidation only reaches the current worker process; other workers see
+changes once their entry expires.
+"""
+
+import time
+from collections import OrderedDict
+
+from app.config import settings
+from app.users.models import User
+
+
+class UserCache:
+    """Bounded TTL/LRU cache of detached User instances keyed by token subject."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+
+    def get(self, subject: str) -> User | None:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[subject]
+            return None
+        self._entries.move_to_end(subject)
+        return user
+
+    def set(self, subject: str, user: User) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache(settings.user_cache_max_size, settings.user_cache_ttl_seconds)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.dependencies import CurrentUser, DbSession
+from app.dependencies import CurrentUserId, DbSession, ReadCurrentUser
 from app.users.schemas import UserResponse, UserUpdate
 from app.users.service import update_user
 
@@ -8,10 +8,10 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: CurrentUser):
+async def get_current_user_profile(current_user: ReadCurrentUser):
     return current_user
 
 
 @router.patch("/me", response_model=UserResponse)
-async def update_current_user(current_user: CurrentUser, db: DbSession, data: UserUpdate):
-    return await update_user(db, current_user.id, data)
+async def update_current_user(user_id: CurrentUserId, db: DbSession, data: UserUpdate):
+    return await update_user(db, user_id, data)
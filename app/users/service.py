@@ -1,8 +1,10 @@
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import event, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import recent_writes
+from app.users.cache import user_cache
 from app.users.models import User
 from app.users.schemas import UserUpdate
 
@@ -23,4 +25,12 @@ async def update_user(db: AsyncSession, user_id: UUID, data: UserUpdate) -> User
         return await get_user_by_id(db, user_id)
 
     await db.execute(update(User).where(User.id == user_id).values(**update_data))
+    cache_key = str(user_id)
+    user_cache.invalidate(cache_key)
+    # A concurrent request may re-cache the old row before this one commits,
+    # so invalidate again once the update is visible
+    event.listen(
+        db.sync_session, "after_commit", lambda _: user_cache.invalidate(cache_key), once=True
+    )
+    recent_writes.mark(user_id)
     return await get_user_by_id(db, user_id)
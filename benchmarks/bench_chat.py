@@ -0,0 +1,198 @@
+"""
+End-to-end throughput benchmark for the chat API.
+
+Drives the ASGI app in process with httpx at a fixed concurrency, with the
+LLM, STT and TTS providers replaced by fakes of configurable latency, against
+the database in DATABASE_URL (a local, migrated Postgres; the benchmark
+creates its own users). Reports latency percentiles, throughput, and SQL
+statements per request for each scenario.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_chat \\
+        --scenario text --scenario voice --concurrency 32 --requests 500
+
+Scenarios: text, voice, login, conversations (GET /conversations).
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import event
+
+from app.config import settings
+from app.database import engine
+from app.main import app
+from app.providers import providers
+from benchmarks.fakes import FakeLLM, FakeSTT, FakeTTS, wav_bytes
+
+PASSWORD = "Bench-passw0rd"
+
+
+class Client:
+    """A benchmark user with a login token and a conversation."""
+
+    def __init__(self, http: httpx.AsyncClient, email: str, token: str, conversation_id: str):
+        self.http = http
+        self.email = email
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.conversation_id = conversation_id
+
+
+async def create_client(http: httpx.AsyncClient) -> Client:
+    email = f"bench-{uuid4().hex[:12]}@example.com"
+    response = await http.post(
+        "/auth/register", json={"full_name": "Bench", "email": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    response = await http.post("/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    token = response.json()["access_token"]
+    response = await http.post(
+        "/conversations", json={"title": "bench"}, headers={"Authorization": f"Bearer {token}"}
+    )
+    response.raise_for_status()
+    return Client(http, email, token, response.json()["id"])
+
+
+async def text_chat(client: Client) -> httpx.Response:
+    return await client.http.post(
+        "/chat/text",
+        json={"conversation_id": client.conversation_id, "content": "I feel tired lately."},
+        headers=client.headers,
+    )
+
+
+def voice_chat(audio: bytes) -> Callable[[Client], Awaitable[httpx.Response]]:
+    async def request(client: Client) -> httpx.Response:
+        return await client.http.post(
+            "/chat/voice",
+            data={"conversation_id": client.conversation_id},
+            files={"audio": ("audio.wav", audio, "audio/wav")},
+            headers=client.headers,
+        )
+
+    return request
+
+
+async def login(client: Client) -> httpx.Response:
+    return await client.http.post("/auth/login", json={"email": client.email, "password": PASSWORD})
+
+
+async def list_conversations(client: Client) -> httpx.Response:
+    return await client.http.get("/conversations", headers=client.headers)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+
+async def run_scenario(
+    name: str,
+    request: Callable[[Client], Awaitable[httpx.Response]],
+    clients: list[Client],
+    total: int,
+    queries: QueryCounter,
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker(client: Client) -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await request(client)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    queries.count = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in clients))
+    elapsed = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "queries": queries.count / len(latencies),
+    }
+
+
+def print_report(results: list[dict]) -> None:
+    print(
+        f"{'scenario':<14} {'requests':>8} {'errors':>6} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['scenario']:<14} {r['requests']:>8} {r['errors']:>6} {r['rps']:>8.1f} "
+            f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['queries']:>8.2f}"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    providers.override(
+        llm=FakeLLM(args.llm_latency),
+        stt=FakeSTT(args.stt_latency),
+        tts=FakeTTS(args.tts_latency),
+    )
+    settings.summary_enabled = args.summaries
+    scenarios = {
+        "text": text_chat,
+        "voice": voice_chat(wav_bytes(seconds=args.audio_seconds)),
+        "login": login,
+        "conversations": list_conversations,
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        clients = await asyncio.gather(*(create_client(http) for _ in range(args.concurrency)))
+        queries = QueryCounter()
+        results = []
+        for name in args.scenario or list(scenarios):
+            if args.warmup:
+                await run_scenario(name, scenarios[name], clients, args.warmup, queries)
+            results.append(
+                await run_scenario(name, scenarios[name], clients, args.requests, queries)
+            )
+    await engine.dispose()
+    print_report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end chat API throughput benchmark")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["text", "voice", "login", "conversations"],
+        help="may be repeated; defaults to all",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="requests discarded per scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds")
+    parser.add_argument("--stt-latency", type=float, default=0.3, help="seconds")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="seconds")
+    parser.add_argument("--audio-seconds", type=float, default=3.0)
+    parser.add_argument(
+        "--summaries",
+        action="store_true",
+        help="let background summarization run, adding its queries to the chat scenarios",
+    )
+    asyncio.run(main(parser.parse_args()))
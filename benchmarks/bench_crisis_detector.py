@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: compiled crisis lexicon vs. per-phrase substring scans.
+
+Builds a synthetic lexicon of a few thousand phrases around the built-in
+ones and times both strategies over large transcripts, with and without a
+match near the end.
+
+    python -m benchmarks.bench_crisis_detector [--phrases 5000] [--words 20000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.guardrails.lexicon import CRISIS_PHRASES, PhraseMatcher, normalize
+
+WORDS = (
+    "i feel tired today and work has been a lot lately my friends say i should rest "
+    "but sleep does not come easily and mornings are heavy मैं ठीक हूं पर थका हुआ हूं"
+).split()
+
+
+def naive_search(phrases: list[str], text: str) -> bool:
+    text_lower = text.lower()
+    return any(phrase in text_lower for phrase in phrases)
+
+
+def timeit(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--phrases", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    phrases = list(CRISIS_PHRASES)
+    while len(phrases) < args.phrases:
+        phrases.append(" ".join(rng.choices(WORDS, k=3)) + f" {len(phrases)}")
+    phrases = [normalize(p) for p in phrases]
+
+    start = time.perf_counter()
+    matcher = PhraseMatcher(phrases)
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(phrases)} phrases compiled in {compile_ms:.1f} ms")
+
+    clean = " ".join(rng.choices(WORDS, k=args.words))
+    transcripts = {"no match": clean, "match at end": clean + " i want to die"}
+    print(f"{'transcript':<14} {'strategy':<10} {'p50 ms':>9} {'max ms':>9}")
+    for name, text in transcripts.items():
+        assert matcher.matches(text) == naive_search(phrases, text)
+        for strategy, fn in (
+            ("naive", lambda: naive_search(phrases, text)),
+            ("compiled", lambda: matcher.matches(text)),
+        ):
+            samples = timeit(fn, args.repeat)
+            print(
+                f"{name:<14} {strategy:<10} {statistics.median(samples):>9.2f} {max(samples):>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
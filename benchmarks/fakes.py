@@ -0,0 +1,72 @@
+"""
+In-process stand-ins for the external providers, with tunable latency.
+
+They let benchmarks exercise the full request path, including auth,
+guardrails, the database and persistence, without calling Gemini or Sarvam.
+"""
+
+import asyncio
+import io
+import wave
+from collections.abc import AsyncGenerator
+from typing import BinaryIO
+
+from app.llm.base import BaseLLM, LLMMessage
+from app.speech.stt.base import BaseSTT
+from app.speech.tts.base import BaseTTS
+
+REPLY = (
+    "That sounds like a lot to carry. It makes sense that you feel tired. "
+    "Would it help to talk about what has been weighing on you the most?"
+)
+
+
+class FakeLLM(BaseLLM):
+    """Replies after ``latency`` seconds; streams the reply word by word."""
+
+    def __init__(self, latency: float = 0.5, token_interval: float = 0.02):
+        self.latency = latency
+        self.token_interval = token_interval
+
+    async def chat(self, messages: list[LLMMessage], system_prompt: str | None = None) -> str:
+        await asyncio.sleep(self.latency)
+        return REPLY
+
+    async def chat_stream(
+        self, messages: list[LLMMessage], system_prompt: str | None = None
+    ) -> AsyncGenerator[str, None]:
+        words = REPLY.split(" ")
+        first_token = max(self.latency - self.token_interval * len(words), 0.0)
+        await asyncio.sleep(first_token)
+        for word in words:
+            await asyncio.sleep(self.token_interval)
+            yield word + " "
+
+
+class FakeSTT(BaseSTT):
+    def __init__(self, latency: float = 0.3):
+        self.latency = latency
+
+    async def transcribe(self, audio_data: bytes | BinaryIO, language: str = "en") -> str:
+        await asyncio.sleep(self.latency)
+        return "I have been feeling really tired and stressed at work lately."
+
+
+class FakeTTS(BaseTTS):
+    def __init__(self, latency: float = 0.3):
+        self.latency = latency
+
+    async def synthesize(self, text: str, lang: str = "en-IN", voice: str = "shubh") -> bytes:
+        await asyncio.sleep(self.latency)
+        return wav_bytes(seconds=len(text) / 15)
+
+
+def wav_bytes(seconds: float, rate: int = 8000) -> bytes:
+    """Silent 16-bit mono WAV of the given duration."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\0\0" * int(rate * seconds))
+    return buffer.getvalue()
@@ -0,0 +1,101 @@
+import io
+import struct
+import wave
+
+import pytest
+
+from app.speech.duration import audio_duration
+
+
+def wav(seconds: float, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(b"\0\0" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def ogg_page(packet: bytes, granule: int) -> bytes:
+    header = b"OggS" + bytes([0, 0]) + struct.pack("<qIII", granule, 1, 0, 0)
+    return header + bytes([1, len(packet)]) + packet
+
+
+def ogg_opus(seconds: float, pre_skip: int = 312) -> bytes:
+    head = b"OpusHead" + bytes([1, 1]) + struct.pack("<HIhB", pre_skip, 48000, 0, 0)
+    granule = pre_skip + int(seconds * 48000)
+    return ogg_page(head, 0) + ogg_page(b"OpusTags", 0) + ogg_page(b"\0" * 40, granule)
+
+
+def ebml(element_id: int, payload: bytes, unknown_size: bool = False) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    size = b"\x01\xff\xff\xff\xff\xff\xff\xff" if unknown_size else (0x80 | len(payload),)
+    return id_bytes + bytes(size) + payload
+
+
+def webm(block_times_ms: list[int], duration_ms: float | None = None) -> bytes:
+    info = ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big"))
+    if duration_ms is not None:
+        info += ebml(0x4489, struct.pack(">d", duration_ms))
+    cluster = ebml(0xE7, b"\x00")
+    for time_ms in block_times_ms:
+        cluster += ebml(0xA3, b"\x81" + struct.pack(">h", time_ms) + b"\x80" + b"\0" * 10)
+    segment = ebml(0x1549A966, info) + ebml(0x1F43B675, cluster, unknown_size=True)
+    return ebml(0x1A45DFA3, ebml(0x4282, b"webm")) + ebml(0x18538067, segment, unknown_size=True)
+
+
+def mp3(frames: int) -> bytes:
+    # MPEG-1 layer III, 128 kbit/s, 44.1 kHz, no padding: 417 bytes, 1152 samples
+    frame = bytes.fromhex("fffb9000") + b"\0" * 413
+    return b"ID3\x04\x00\x00\x00\x00\x00\x0a" + b"\0" * 10 + frame * frames + b"TAG" + b"\0" * 125
+
+
+def flac(seconds: float, rate: int = 44100) -> bytes:
+    packed = (rate << 44) | (1 << 41) | (15 << 36) | int(seconds * rate)
+    streaminfo = b"\0" * 10 + packed.to_bytes(8, "big") + b"\0" * 16
+    return b"fLaC" + bytes([0x80, 0, 0, 34]) + streaminfo
+
+
+def mp4(seconds: float, timescale: int = 1000) -> bytes:
+    mvhd = b"\0\0\0\0" + struct.pack(">IIII", 0, 0, timescale, int(seconds * timescale))
+    mvhd += b"\0" * 80
+    moov = struct.pack(">I4s", 8 + 8 + len(mvhd), b"moov") + struct.pack(
+        ">I4s", 8 + len(mvhd), b"mvhd"
+    )
+    ftyp = struct.pack(">I4s", 16, b"ftyp") + b"M4A \0\0\0\0"
+    return ftyp + struct.pack(">I4s", 8, b"free") + moov + mvhd
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (wav(2.5), 2.5),
+        (ogg_opus(3.0), 3.0),
+        (webm([0, 20, 1980], duration_ms=2000.0), 2.0),
+        (webm([0, 20, 1980]), 1.98),
+        (mp3(100), 100 * 1152 / 44100),
+        (flac(4.0), 4.0),
+        (mp4(5.5), 5.5),
+    ],
+    ids=["wav", "ogg", "webm-duration", "webm-blocks", "mp3", "flac", "mp4"],
+)
+def test_duration(data, expected):
+    audio = io.BytesIO(data)
+    assert audio_duration(audio) == pytest.approx(expected)
+    assert audio.tell() == 0
+
+
+@pytest.mark.parametrize("data", [b"", b"not audio at all", b"OggS" + b"\0" * 10, b"RIFF"])
+def test_unrecognized(data):
+    assert audio_duration(io.BytesIO(data)) is None
+
+
+def test_gives_up_on_too_many_elements():
+    void = ebml(0xEC, b"")
+    data = ebml(0x1A45DFA3, b"") + ebml(0x18538067, void * 60_000, unknown_size=True)
+    assert audio_duration(io.BytesIO(data)) is None
+
+
+def test_gives_up_on_too_many_frames():
+    assert audio_duration(io.BytesIO(mp3(60_000))) is None
@@ -0,0 +1,21 @@
+from contextlib import aclosing
+
+from app.metrics import instrument_provider
+
+
+async def test_instrumented_stream_closes_provider_stream():
+    closed = []
+
+    @instrument_provider("test", "stream")
+    async def stream():
+        try:
+            for item in range(10):
+                yield item
+        finally:
+            closed.append(True)
+
+    async with aclosing(stream()) as items:
+        async for item in items:
+            if item == 1:
+                break
+    assert closed == [True]
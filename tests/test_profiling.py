@@ -0,0 +1,13 @@
+import os
+
+from app.profiling import ProfilingMiddleware
+
+
+def test_only_newest_profiles_are_kept(tmp_path):
+    middleware = ProfilingMiddleware(None, ("/chat",), 0.0, "", str(tmp_path), 0.001, max_files=2)
+    for stamp in ("20260101T000001", "20260101T000002", "20260101T000003"):
+        middleware._write(tmp_path / f"{stamp}-abcd1234-POST-chat.folded", "task a;main 1\n")
+    assert sorted(os.listdir(tmp_path)) == [
+        "20260101T000002-abcd1234-POST-chat.folded",
+        "20260101T000003-abcd1234-POST-chat.folded",
+    ]
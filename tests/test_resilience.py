@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from app.llm.resilience import LatencyTracker, RetryBudget, hedged, timed
+
+
+def test_retry_budget_starts_with_min_tokens():
+    budget = RetryBudget(ratio=0.1, min_tokens=3)
+    assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+
+
+def test_retry_budget_refills_from_requests():
+    budget = RetryBudget(ratio=0.5, min_tokens=1)
+    assert budget.try_spend()
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+
+
+def test_retry_budget_is_capped():
+    budget = RetryBudget(ratio=1.0, min_tokens=2)
+    for _ in range(10):
+        budget.record_request()
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+def test_percentile_needs_min_samples():
+    latencies = LatencyTracker(min_samples=3)
+    latencies.observe(1.0)
+    latencies.observe(2.0)
+    assert latencies.percentile(0.5) is None
+
+
+@pytest.mark.parametrize(
+    ("q", "expected"), [(0.0, 1), (0.5, 50), (0.95, 95), (0.99, 99), (1.0, 100)]
+)
+def test_percentile(q, expected):
+    latencies = LatencyTracker(min_samples=1)
+    for value in range(100, 0, -1):
+        latencies.observe(value)
+    assert latencies.percentile(q) == expected
+
+
+def test_percentile_uses_recent_window():
+    latencies = LatencyTracker(window=3, min_samples=1)
+    for value in (100, 1, 2, 3):
+        latencies.observe(value)
+    assert latencies.percentile(1.0) == 3
+
+
+async def test_timed_records_success_and_cutoff():
+    latencies = LatencyTracker(min_samples=1)
+    assert await timed(asyncio.sleep(0.01, "ok"), latencies) == "ok"
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(timed(asyncio.sleep(1), latencies), 0.05)
+    assert len(latencies._samples) == 2
+    assert latencies.percentile(1.0) >= 0.05
+
+
+async def test_timed_skips_failures():
+    async def fail():
+        raise ValueError
+
+    latencies = LatencyTracker(min_samples=1)
+    with pytest.raises(ValueError):
+        await timed(fail(), latencies)
+    assert latencies.percentile(0.5) is None
+
+
+async def reply(value, seconds=0.0, error=None):
+    await asyncio.sleep(seconds)
+    if error is not None:
+        raise error
+    return value
+
+
+async def test_hedged_without_delay_runs_primary_only():
+    hedges = []
+    result = await hedged(lambda: reply("primary"), lambda: reply("hedge"), None, hedges.append)
+    assert result == "primary"
+    assert hedges == []
+
+
+async def test_hedged_fast_primary_is_not_hedged():
+    hedges = []
+    result = await hedged(
+        lambda: reply("primary"), lambda: reply("hedge"), 0.1, lambda: hedges.append(1)
+    )
+    assert result == "primary"
+    assert hedges == []
+
+
+async def test_hedged_slow_primary_loses_to_hedge():
+    cancelled = asyncio.Event()
+
+    async def stuck():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    hedges = []
+    result = await hedged(stuck, lambda: reply("hedge"), 0.01, lambda: hedges.append(1))
+    assert result == "hedge"
+    assert hedges == [1]
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+async def test_hedged_failed_primary_falls_back_to_hedge():
+    result = await hedged(
+        lambda: reply(None, 0.02, RuntimeError("primary")), lambda: reply("hedge", 0.05), 0.01
+    )
+    assert result == "hedge"
+
+
+async def test_hedged_both_failing_raise_primary_error():
+    with pytest.raises(RuntimeError, match="primary"):
+        await hedged(
+            lambda: reply(None, 0.02, RuntimeError("primary")),
+            lambda: reply(None, 0.0, RuntimeError("hedge")),
+            0.01,
+        )
+
+
+async def test_hedged_discards_unused_result():
+    release = asyncio.Event()
+    discarded = []
+
+    async def after_release(value):
+        await release.wait()
+        return value
+
+    async def discard(value):
+        discarded.append(value)
+
+    call = asyncio.ensure_future(
+        hedged(
+            lambda: after_release("primary"), lambda: after_release("hedge"), 0.01, discard=discard
+        )
+    )
+    await asyncio.sleep(0.05)
+    release.set()
+    result = await call
+    assert len(discarded) == 1
+    assert {result, *discarded} == {"primary", "hedge"}
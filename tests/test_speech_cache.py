@@ -0,0 +1,59 @@
+import os
+import time
+
+from app.config import settings
+from app.providers import ProviderRegistry
+from app.speech import BaseSTT
+from app.speech.cache import SpeechCache
+
+
+def age(path, seconds):
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+async def test_disk_tier_survives_restart(tmp_path):
+    await SpeechCache("tts", 1024, str(tmp_path), 1024).set("a", b"audio")
+    assert await SpeechCache("tts", 1024, str(tmp_path), 1024).get("a") == b"audio"
+
+
+async def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = SpeechCache("tts", 0, str(tmp_path), max_disk_bytes=1024)
+    for i, key in enumerate("abc"):
+        await cache.set(key, bytes(100))
+        age(tmp_path / "tts" / key, 100 - i)
+    # Reading "a" makes it the most recently used
+    assert await cache.get("a") is not None
+
+    cache = SpeechCache("tts", 0, str(tmp_path), max_disk_bytes=250)
+    await cache.set("d", bytes(100))
+    assert sorted(os.listdir(tmp_path / "tts")) == ["a", "d"]
+
+
+async def test_disk_tier_expires_unused_entries(tmp_path):
+    cache = SpeechCache("tts", 0, str(tmp_path), max_disk_bytes=1024, disk_ttl_seconds=60)
+    await cache.set("old", b"x")
+    age(tmp_path / "tts" / "old", 120)
+    assert await cache.get("old") is None
+    assert not (tmp_path / "tts" / "old").exists()
+
+
+async def test_transcripts_are_not_written_to_disk(tmp_path, monkeypatch):
+    class FakeSTT(BaseSTT):
+        calls = 0
+
+        async def transcribe(self, audio_data, language="en"):
+            FakeSTT.calls += 1
+            return "transcript"
+
+    monkeypatch.setattr(settings, "provider_mode", "live")
+    monkeypatch.setattr(settings, "speech_cache_enabled", True)
+    monkeypatch.setattr(settings, "speech_cache_dir", str(tmp_path))
+    monkeypatch.setattr("app.providers.get_stt", FakeSTT)
+    stt = ProviderRegistry().stt
+
+    assert await stt.transcribe(b"audio") == "transcript"
+    assert await stt.transcribe(b"audio") == "transcript"
+    # Served from the memory tier the second time
+    assert FakeSTT.calls == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,44 @@
+import pytest
+
+from app.guardrails.lexicon import HARMFUL_OUTPUT_PHRASES, PhraseMatcher, harmful_output_matcher
+from app.guardrails.output import StreamingValidator
+
+REPLY = "ok so you should stop taking your medication now"
+
+
+def feed_all(validator: StreamingValidator, chunks: list[str]) -> bool:
+    return all(validator.feed(chunk) for chunk in chunks)
+
+
+@pytest.mark.parametrize("phrase", HARMFUL_OUTPUT_PHRASES)
+def test_phrase_split_at_every_offset(phrase):
+    text = f"well, {phrase} okay"
+    for offset in range(1, len(text)):
+        validator = StreamingValidator(harmful_output_matcher)
+        assert not feed_all(validator, [text[:offset], text[offset:]]), offset
+        assert validator.error is not None
+
+
+@pytest.mark.parametrize("size", range(1, len(REPLY) + 1))
+def test_fixed_size_chunks(size):
+    assert harmful_output_matcher.matches(REPLY)
+    chunks = [REPLY[i : i + size] for i in range(0, len(REPLY), size)]
+    assert not feed_all(StreamingValidator(harmful_output_matcher), chunks)
+
+
+def test_safe_reply_passes():
+    text = "It sounds like a hard week. Would you like to talk about it?"
+    validator = StreamingValidator(harmful_output_matcher)
+    assert feed_all(validator, list(text))
+    assert validator.error is None
+
+
+def test_stays_invalid_after_violation():
+    validator = StreamingValidator(PhraseMatcher(["secret"]))
+    assert not validator.feed("a secret")
+    assert not validator.feed(" and more")
+
+
+def test_disabled():
+    validator = StreamingValidator(harmful_output_matcher, enabled=False)
+    assert validator.feed(REPLY)
@@ -0,0 +1,74 @@
+import io
+import json
+import wave
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.chat.uploads import UploadSizeLimitMiddleware, open_audio_upload
+from app.config import settings
+
+
+async def call(middleware, content_length: bytes) -> list[dict]:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "path": "/chat/voice",
+        "headers": [(b"content-length", content_length)],
+    }
+    await middleware(scope, receive, send)
+    return sent
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+@pytest.mark.parametrize(
+    ("content_length", "status_code"),
+    [(b"100", 200), (b"1001", 413), (b"abc", 400), (b"-1", 400), (b"", 400)],
+)
+async def test_content_length(content_length, status_code):
+    middleware = UploadSizeLimitMiddleware(ok_app, ("/chat/voice",), max_bytes=1000)
+    sent = await call(middleware, content_length)
+    assert sent[0]["status"] == status_code
+    if status_code != 200:
+        assert "detail" in json.loads(sent[1]["body"])
+
+
+def upload(data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), size=len(data))
+
+
+def wav(seconds: float) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(8000)
+        out.writeframes(b"\0\0" * int(seconds * 8000))
+    return buffer.getvalue()
+
+
+def test_accepts_short_clip():
+    assert open_audio_upload(upload(wav(1))).read(4) == b"RIFF"
+
+
+def test_rejects_long_clip():
+    with pytest.raises(HTTPException) as error:
+        open_audio_upload(upload(wav(settings.audio_upload_max_seconds + 1)))
+    assert error.value.status_code == 413
+
+
+def test_rejects_unmeasurable_format():
+    with pytest.raises(HTTPException) as error:
+        open_audio_upload(upload(b"\0" * 64))
+    assert error.value.status_code == 415